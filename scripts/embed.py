@@ -7,25 +7,52 @@ Usage:
 """
 import sys
 import os
-import json
+import queue
+import threading
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 from pathlib import Path
-import yaml
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.embeddings.embedder import Embedder
+# Batch embedding is CPU-bound on CPU hosts, and BERT-class encoders scale
+# poorly past ~8 threads. OpenMP/MKL read these only once, at torch import,
+# so they are set here before the embedder import (explicit user settings
+# win). Other entry points (web API, query daemon) keep the library defaults.
+os.environ.setdefault("OMP_NUM_THREADS", str(min(8, os.cpu_count() or 1)))
+os.environ.setdefault("MKL_NUM_THREADS", str(min(8, os.cpu_count() or 1)))
+
+from src.embeddings.embedder import Embedder, detect_device
 from src.preprocessing.cleaner import MessageCleaner
 from src.preprocessing.chunker import TextChunker
 from src.storage.vector_store import VectorStore
 from src.utils.state_manager import StateManager
+from src.utils.raw_data import iter_raw_messages, list_raw_files
+from src.utils.config_loader import load_config
+
+
+# Default encode batch per device: CPU is compute-bound so large padded
+# batches only waste work, while GPU/MPS need bigger batches to stay busy.
+DEVICE_BATCH_SIZES = {'cuda': 128, 'mps': 32, 'cpu': 16}
+
+# Below this many messages, worker start-up costs more than the cleaning itself
+PARALLEL_PREP_MIN_MESSAGES = 1000
 
+# Messages cleaned/chunked per producer step, and sub-batches queued ahead of the embedder
+MESSAGE_GROUP_SIZE = 2000
+PIPELINE_QUEUE_SIZE = 4
 
-def load_config():
-    """Load configuration from config.yaml"""
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+# Chunks embedded per sub-batch, and default rows per ChromaDB insert. Chroma
+# has high per-call overhead, so inserts are accumulated well past the size
+# that keeps the embedder fed.
+EMBED_SUB_BATCH_SIZE = 512
+DEFAULT_STORE_BATCH_SIZE = 2000
+
+# Writes allowed to be in flight to ChromaDB before the embedder waits
+MAX_PENDING_WRITES = 2
 
 
 def get_pending_raw_files(raw_data_path: str, state_mgr: StateManager):
@@ -36,136 +63,328 @@ def get_pending_raw_files(raw_data_path: str, state_mgr: StateManager):
         print(f"❌ Directory not found: {raw_dir}")
         return []
     
-    # Find all JSON files
-    json_files = list(raw_dir.glob("gmail_*.json"))
+    # Find all JSON files, oldest modification time first
+    json_files = list_raw_files(raw_dir)
     
     if not json_files:
         print(f"❌ No data files found in {raw_dir}")
         return []
     
-    # Sort by modification time (oldest first)
-    json_files.sort(key=lambda p: p.stat().st_mtime)
+    # We track files by their basename
+    embedded = state_mgr.get_set("embedding", "gmail")
+    return [f for f in json_files if f.name not in embedded]
+
+
+def prepare_texts(messages: list, pool=None, workers: int = 1) -> list:
+    """
+    Run MessageCleaner.prepare_for_embedding over messages, on `pool` (of
+    `workers` processes) if given.
     
-    pending_files = []
-    for f in json_files:
-        # We track files by their basename
-        if not state_mgr.is_in_list("embedding", "gmail", f.name):
-            pending_files.append(f)
+    Only subject/content are shipped to worker processes; attachments and raw
+    payloads stay in the parent.
+    """
+    if pool is not None:
+        slim = [{'subject': m.get('subject', ''), 'content': m.get('content', '')} for m in messages]
+        chunksize = max(1, len(slim) // (4 * workers))
+        return pool.map(MessageCleaner.prepare_for_embedding, slim, chunksize=chunksize)
+    return [MessageCleaner.prepare_for_embedding(m) for m in messages]
+
+
+def _produce_sub_batches(file_path: Path, chunker: TextChunker, sub_batch_size: int,
+                         workers: int, out_q: queue.Queue, stop: threading.Event):
+    """
+    Producer stage: stream messages from the file, then clean, chunk and
+    length-sort them one group at a time, queueing sub-batches of chunks for
+    the embedder.
     
-    return pending_files
+    Always finishes with a None sentinel; an exception is queued before it.
+    """
+    pool = None
+    try:
+        messages = iter_raw_messages(file_path)
+        while True:
+            group = list(islice(messages, MESSAGE_GROUP_SIZE))
+            if not group:
+                break
+            if pool is None and workers > 1 and len(group) >= PARALLEL_PREP_MIN_MESSAGES:
+                pool = Pool(workers)
+            
+            for msg, text in zip(group, prepare_texts(group, pool, workers)):
+                msg['embedding_text'] = text
+            
+            chunks = chunker.chunk_messages(group)
+            
+            # Smart batching: order chunks longest-first so each sub-batch holds
+            # similar-length texts and the transformer pads only to its local max.
+            # Storage is keyed by chunk ID, so the original order need not be kept.
+            chunks.sort(key=lambda m: len(m.get('embedding_text', '')), reverse=True)
+            
+            for i in range(0, len(chunks), sub_batch_size):
+                if stop.is_set():
+                    return
+                out_q.put(chunks[i:i + sub_batch_size])
+    except Exception as e:
+        out_q.put(e)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        out_q.put(None)
 
 
-def process_file(file_path: Path, embedder: Embedder, vector_store: VectorStore, chunker: TextChunker, sub_batch_size: int = 100):
-    """Process a single raw data file in smaller batches to save memory"""
-    import gc
+def process_file(file_path: Path, embedder: Embedder, vector_store: VectorStore, chunker: TextChunker,
+                 encode_batch_size: int = 32, store_batch_size: int = DEFAULT_STORE_BATCH_SIZE,
+                 workers: int = 1, writer: ThreadPoolExecutor = None):
+    """
+    Process a single raw data file in smaller batches to save memory.
+    
+    Cleaning and chunking run in a producer thread, this thread embeds, and
+    ChromaDB writes run on `writer` (a single-thread pool is created if none
+    is given), so the model is not idle during the Python-bound or I/O stages.
+    Chunks are embedded `encode_batch_size` at a time (one model forward pass)
+    and accumulated until `store_batch_size` rows can go to ChromaDB in one
+    call; the remainder is flushed at end of file. Preprocessing uses
+    up to `workers` processes.
+    """
     print(f"[INFO] Processing: {file_path.name}")
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    sub_batch_size = min(EMBED_SUB_BATCH_SIZE, store_batch_size)
+    success = True
+    processed = 0
+    
+    own_writer = writer is None
+    if own_writer:
+        writer = ThreadPoolExecutor(max_workers=1)
+    pending_writes = deque()  # (future, chunk_count), oldest first
     
-    messages = data.get('messages', [])
-    if not messages:
-        print(f"  [SKIP] No messages in {file_path.name}")
+    def settle_writes(limit: int) -> bool:
+        """Wait for the oldest writes until at most `limit` are in flight"""
+        nonlocal processed
+        while len(pending_writes) > limit:
+            future, count = pending_writes.popleft()
+            if not future.result():
+                print(f"  [ERROR] Failed to store batch after {processed} chunks")
+                return False
+            processed += count
+            print(f"    Processed {processed} chunks...")
         return True
     
-    print(f"  Step 1: Preprocessing {len(messages)} messages...")
-    for msg in messages:
-        msg['embedding_text'] = MessageCleaner.prepare_for_embedding(msg)
+    print(f"  Streaming, preprocessing and chunking messages in the background...")
+    print(f"  Embedding (batch {encode_batch_size}) and Storing in batches of {store_batch_size}...")
+    
+    sub_batches = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_produce_sub_batches,
+        args=(file_path, chunker, sub_batch_size, workers, sub_batches, stop),
+        daemon=True
+    )
+    producer.start()
     
-    print(f"  Step 2: Chunking...", flush=True)
-    print(f"  [DEBUG] About to call chunker.chunk_messages with {len(messages)} messages", flush=True)
-    chunked_messages = chunker.chunk_messages(messages)
-    print(f"  Created {len(chunked_messages)} total chunks")
+    to_store = []  # Embedded chunks not yet handed to the writer
     
-    # Process chunks in smaller sub-batches
-    total_chunks = len(chunked_messages)
-    success = True
+    def flush():
+        """Hand the accumulated chunks to the writer as one insert"""
+        nonlocal to_store
+        if to_store:
+            # The writer owns this list now; reference counting frees it
+            # once the write settles, so no gc pass is needed here.
+            pending_writes.append((writer.submit(vector_store.add_messages, to_store), len(to_store)))
+            to_store = []
     
-    print(f"  Step 3 & 4: Embedding and Storing in sub-batches of {sub_batch_size}...")
-    for i in range(0, total_chunks, sub_batch_size):
-        sub_batch = chunked_messages[i:i + sub_batch_size]
+    try:
+        while True:
+            sub_batch = sub_batches.get()
+            if sub_batch is None:
+                break
+            if isinstance(sub_batch, Exception):
+                raise sub_batch
+            
+            # Generate embeddings for this sub-batch
+            sub_batch = embedder.embed_messages(
+                sub_batch,
+                text_key='embedding_text',
+                batch_size=max(1, min(encode_batch_size, len(sub_batch)))
+            )
+            
+            # Store in the background while the next sub-batches are embedded
+            to_store.extend(sub_batch)
+            if len(to_store) >= store_batch_size:
+                flush()
+                if not settle_writes(MAX_PENDING_WRITES):
+                    success = False
+                    break
         
-        # Generate embeddings for this sub-batch
-        sub_batch = embedder.embed_messages(sub_batch, text_key='embedding_text')
+        if success:
+            flush()
+            success = settle_writes(0)
+    except BaseException:
+        # Keep what was already embedded; the file is retried either way
+        flush()
+        raise
+    finally:
+        # Let in-flight writes finish before the file is reported
+        for future, _ in pending_writes:
+            future.exception()
+        if own_writer:
+            writer.shutdown(wait=True)
         
-        # Store this sub-batch immediately
-        if not vector_store.add_messages(sub_batch):
-            print(f"  [ERROR] Failed to add sub-batch {i//sub_batch_size + 1}")
-            success = False
+        # Unblock and retire the producer if we stopped early
+        stop.set()
+        while producer.is_alive():
+            try:
+                sub_batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+    
+    if success and processed == 0:
+        print(f"  [SKIP] No messages in {file_path.name}")
+    else:
+        print(f"  Stored {processed} chunks")
+    
+    return success
+
+
+def _reload_preprocessing():
+    """Reload the cleaning/chunking modules and rebind TextChunker (DIDI_DEV_RELOAD)"""
+    global TextChunker
+    import importlib
+    # Cleaner first so the reloaded chunker binds the fresh version
+    for name in ('src.preprocessing.semantic_cleaner', 'src.preprocessing.chunker'):
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+            print(f"[DEBUG] Reloaded {name}", flush=True)
+    TextChunker = sys.modules['src.preprocessing.chunker'].TextChunker
+
+
+def build_components(config: dict, device: str, use_cache: bool = True):
+    """
+    Create the chunker, embedder and vector store from config.
+    
+    Args:
+        config: Parsed config.yaml
+        device: Embedding device ('cuda', 'mps' or 'cpu')
+        use_cache: Give the embedder its content-hash embedding cache
+        
+    Returns:
+        Tuple of (chunker, embedder, vector_store)
+    """
+    embeddings_config = config['embeddings']
+    storage_config = config['storage']
+    
+    # Get chunking config with defaults
+    chunk_config = config.get('chunking', {})
+    chunk_size = chunk_config.get('chunk_size', 2000)
+    chunk_overlap = chunk_config.get('overlap', 200)
+    min_chars = chunk_config.get('min_chars', 8)
+    print(f"[CONFIG] Chunking: size={chunk_size}, overlap={chunk_overlap}, min_chars={min_chars}")
+    print(f"[CONFIG] Embedding device: {device}")
+    
+    chunker = TextChunker(chunk_size=chunk_size, overlap=chunk_overlap, min_chars=min_chars)
+    embedder = Embedder(model_name=embeddings_config['model_name'], device=device,
+                        precision=embeddings_config.get('precision', 'auto'),
+                        backend=embeddings_config.get('backend', 'torch'),
+                        num_threads=embeddings_config.get('num_threads'),
+                        cache_path=embeddings_config.get('cache_path', './data/embed_cache.db') if use_cache else None,
+                        compile_model=embeddings_config.get('compile', False))
+    vector_store = VectorStore(
+        persist_directory=storage_config['chromadb_path'],
+        collection_name=storage_config['collection_name']
+    )
+    return chunker, embedder, vector_store
+
+
+def embed_files(files: list, state_mgr: StateManager, chunker: TextChunker, embedder: Embedder,
+                vector_store: VectorStore, encode_batch_size: int = 32,
+                store_batch_size: int = DEFAULT_STORE_BATCH_SIZE, workers: int = 1, writer: ThreadPoolExecutor = None) -> int:
+    """
+    Embed and store files in order, recording each finished file in the state.
+    
+    Stops at the first file that fails so it is retried on the next run.
+    
+    Returns:
+        Number of files processed successfully
+    """
+    import gc
+    processed_count = 0
+    for f in files:
+        success = process_file(f, embedder, vector_store, chunker,
+                               encode_batch_size=encode_batch_size,
+                               store_batch_size=store_batch_size,
+                               workers=workers,
+                               writer=writer)
+        if success:
+            state_mgr.add_to_list("embedding", "gmail", f.name)
+            processed_count += 1
+            print(f"  [OK] Finished {f.name}")
+        else:
+            print(f"  [ERROR] Failed to process {f.name}")
             break
+        
+        # Periodically save state (every 5 files) to prevent data loss in case of crash
+        if processed_count % 5 == 0:
+            state_mgr.save()
+            print("  [INFO] State saved to disk")
             
-        # Clear sub-batch from memory
-        del sub_batch
+        # Explicitly clear memory between files
         gc.collect()
-        
-        if (i + sub_batch_size) < total_chunks:
-            print(f"    Processed {min(i + sub_batch_size, total_chunks)}/{total_chunks} chunks...")
-
-    # Clear large objects
-    del chunked_messages
-    del messages
-    del data
-    gc.collect()
+        print("-" * 40)
     
-    return success
+    return processed_count
 
 
 def main():
     import argparse
-    import gc
     parser = argparse.ArgumentParser(description="Generate embeddings and store in ChromaDB")
     parser.add_argument("--full", action="store_true", help="Force re-embedding of all files")
-    parser.add_argument("--batch-size", type=int, default=50, help="Sub-batch size for memory safety (default: 50)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Encode batch size per forward pass (default: per device, cuda=128 mps=32 cpu=16)")
+    parser.add_argument("--store-batch-size", type=int, default=None,
+                        help=f"Rows per ChromaDB insert (default: storage.write_batch_size or {DEFAULT_STORE_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for message preprocessing on large files (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not reuse or record embeddings in the content-hash cache")
+    parser.add_argument("--device", choices=['cuda', 'mps', 'cpu'], default=None,
+                        help="Embedding device (default: embeddings.device in config, else auto-detect)")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print the ChromaDB collection size at the end of the run")
     args = parser.parse_args()
 
     print("=" * 80)
     print("Did-I - Embedding Generation & Storage (Memory Optimized)")
     print("=" * 80)
-    print(f"[CONFIG] Sub-batch size: {args.batch_size}")
     print()
     
     # Load config
     config = load_config()
     embeddings_config = config['embeddings']
-    storage_config = config['storage']
     paths_config = config['paths']
     
     # Initialize StateManager with auto_save=False for performance
     # We will save manually after each batch or at the end
     state_mgr = StateManager(auto_save=False)
     
-    # Force reload of preprocessing modules to get latest code
-    import sys
-    import importlib
-    if 'src.preprocessing.chunker' in sys.modules:
-        importlib.reload(sys.modules['src.preprocessing.chunker'])
-        print("[DEBUG] Reloaded chunker module before instantiation", flush=True)
-    if 'src.preprocessing.semantic_cleaner' in sys.modules:
-        importlib.reload(sys.modules['src.preprocessing.semantic_cleaner'])
-        print("[DEBUG] Reloaded semantic_cleaner module", flush=True)
+    # Dev-only: pick up edited preprocessing code in long-lived interpreters.
+    # Normal runs use the modules imported at the top of the file.
+    if os.environ.get('DIDI_DEV_RELOAD'):
+        _reload_preprocessing()
     
     # Initialize components
     print("Step 1: Initializing components...")
-    
-    # Get chunking config with defaults
-    chunk_config = config.get('chunking', {})
-    chunk_size = chunk_config.get('chunk_size', 2000)
-    chunk_overlap = chunk_config.get('overlap', 200)
-    print(f"[CONFIG] Chunking: size={chunk_size}, overlap={chunk_overlap}")
-    
-    chunker = TextChunker(chunk_size=chunk_size, overlap=chunk_overlap)
-    embedder = Embedder(model_name=embeddings_config['model_name'])
-    vector_store = VectorStore(
-        persist_directory=storage_config['chromadb_path'],
-        collection_name=storage_config['collection_name']
-    )
+    device = args.device or embeddings_config.get('device') or detect_device()
+    encode_batch_size = args.batch_size or DEVICE_BATCH_SIZES.get(device, 16)
+    store_batch_size = args.store_batch_size or config['storage'].get('write_batch_size', DEFAULT_STORE_BATCH_SIZE)
+    chunker, embedder, vector_store = build_components(config, device, use_cache=not args.no_cache)
+    print(f"[CONFIG] Encode batch size: {encode_batch_size}, store batch size: {store_batch_size}")
     print()
     
     # Find pending files
     raw_path = paths_config['raw_data']
     if args.full:
         print("[INFO] Full mode: scanning all files regardless of state")
-        pending_files = sorted(list(Path(raw_path).glob("gmail_*.json")), key=lambda p: p.stat().st_mtime)
+        pending_files = list_raw_files(raw_path)
     else:
         pending_files = get_pending_raw_files(raw_path, state_mgr)
     
@@ -176,37 +395,30 @@ def main():
     print(f"Found {len(pending_files)} files to process.")
     print()
     
-    processed_count = 0
-    for f in pending_files:
-        success = process_file(f, embedder, vector_store, chunker, sub_batch_size=args.batch_size)
-        if success:
-            state_mgr.add_to_list("embedding", "gmail", f.name)
-            processed_count += 1
-            print(f"  [OK] Finished {f.name}")
-        else:
-            print(f"  [ERROR] Failed to process {f.name}")
-            break
-        
-        # Periodically save state (every 5 files) to prevent data loss in case of crash
-        if processed_count % 5 == 0:
-            state_mgr.save()
-            print("  [INFO] State saved to disk", flush=True)
-            
-        # Explicitly clear memory between files
-        gc.collect()
-        print("-" * 40, flush=True)
+    # One background writer for the whole run keeps ChromaDB inserts ordered
+    # while overlapping them with embedding
+    writer = ThreadPoolExecutor(max_workers=1)
+    
+    processed_count = embed_files(pending_files, state_mgr, chunker, embedder, vector_store,
+                                  encode_batch_size=encode_batch_size,
+                                  store_batch_size=store_batch_size,
+                                  workers=args.workers, writer=writer)
+    
+    writer.shutdown(wait=True)
+    embedder.close()
     
     # Final save
     state_mgr.save()
-    print("[INFO] Final state saved to disk", flush=True)
+    print("[INFO] Final state saved to disk")
     
-    # Show stats
-    stats = vector_store.get_stats()
     print()
     print("=" * 80)
     print("[OK] Embedding session complete!")
     print(f"   Files processed: {processed_count}")
-    print(f"   Total messages in ChromaDB: {stats['total_messages']}")
+    if args.stats:
+        # Counting a very large collection is not free; only do it on request
+        stats = vector_store.get_stats()
+        print(f"   Total messages in ChromaDB: {stats['total_messages']}")
     print("=" * 80)
     print()
     print("Next step: Run 'python scripts/query.py \"your question\"' to search")
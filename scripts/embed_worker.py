@@ -0,0 +1,134 @@
+"""
+Embedding worker - keep the model and ChromaDB resident and embed new raw files.
+Path: scripts/embed_worker.py
+
+Usage:
+    python scripts/embed_worker.py                 # Poll data/raw every 30s
+    python scripts/embed_worker.py --interval 10   # Custom poll interval
+
+Running embed.py per batch pays the model load and ChromaDB open every time.
+The worker pays it once and then embeds pending files as they appear. It
+also listens on localhost (embed_worker.port in config.yaml); ingest.py
+connects there after saving raw data so new files are picked up right away.
+"""
+import sys
+import os
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add src and scripts to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Imported first: embed sets the OpenMP/MKL thread defaults before torch loads
+from embed import (build_components, embed_files, get_pending_raw_files,
+                   DEVICE_BATCH_SIZES, DEFAULT_STORE_BATCH_SIZE)
+from src.embeddings.embedder import detect_device
+from src.utils.state_manager import StateManager
+from src.utils.config_loader import load_config
+
+DEFAULT_PORT = 8766
+DEFAULT_POLL_INTERVAL = 30
+
+
+class _TriggerHandler(socketserver.StreamRequestHandler):
+    """Any connection wakes the worker for an immediate scan"""
+    
+    def handle(self):
+        self.rfile.readline()
+        self.server.wake.set()
+        self.wfile.write(b"ok\n")
+
+
+def start_trigger_server(port: int, wake: threading.Event) -> socketserver.TCPServer:
+    """
+    Listen on localhost for scan triggers in a background thread.
+    
+    Args:
+        port: TCP port on 127.0.0.1
+        wake: Event set whenever a trigger arrives
+        
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    socketserver.TCPServer.allow_reuse_address = True
+    server = socketserver.TCPServer(("127.0.0.1", port), _TriggerHandler)
+    server.wake = wake
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Long-running embedding worker")
+    parser.add_argument("--interval", type=float, default=None,
+                        help=f"Seconds between scans of the raw data folder (default: {DEFAULT_POLL_INTERVAL})")
+    parser.add_argument("--port", type=int, default=None,
+                        help=f"Localhost port for scan triggers (default: {DEFAULT_PORT})")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Encode batch size per forward pass (default: per device)")
+    parser.add_argument("--store-batch-size", type=int, default=None,
+                        help=f"Rows per ChromaDB insert (default: storage.write_batch_size or {DEFAULT_STORE_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for message preprocessing on large files (default: CPU count)")
+    parser.add_argument("--device", choices=['cuda', 'mps', 'cpu'], default=None,
+                        help="Embedding device (default: embeddings.device in config, else auto-detect)")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("Did-I - Embedding Worker")
+    print("=" * 80)
+    print()
+    
+    config = load_config()
+    worker_config = config.get('embed_worker', {})
+    interval = args.interval or worker_config.get('poll_interval', DEFAULT_POLL_INTERVAL)
+    port = args.port or worker_config.get('port', DEFAULT_PORT)
+    raw_path = config['paths']['raw_data']
+    
+    # Load everything once; it stays resident for the life of the worker
+    device = args.device or config['embeddings'].get('device') or detect_device()
+    encode_batch_size = args.batch_size or DEVICE_BATCH_SIZES.get(device, 16)
+    store_batch_size = args.store_batch_size or config['storage'].get('write_batch_size', DEFAULT_STORE_BATCH_SIZE)
+    chunker, embedder, vector_store = build_components(config, device)
+    writer = ThreadPoolExecutor(max_workers=1)
+    
+    wake = threading.Event()
+    wake.set()  # Scan once on startup
+    server = start_trigger_server(port, wake)
+    print()
+    print(f"[OK] Watching {raw_path} (every {interval}s, triggers on 127.0.0.1:{port})")
+    print("   Press Ctrl+C to stop")
+    print()
+    
+    try:
+        while True:
+            wake.wait(timeout=interval)
+            wake.clear()
+            
+            # Re-read state each pass: ingest.py and sync_kb.py write the same file
+            state_mgr = StateManager(auto_save=False)
+            pending_files = get_pending_raw_files(raw_path, state_mgr)
+            if not pending_files:
+                continue
+            
+            print(f"Found {len(pending_files)} new files to process.")
+            processed_count = embed_files(pending_files, state_mgr, chunker, embedder, vector_store,
+                                          encode_batch_size=encode_batch_size,
+                                          store_batch_size=store_batch_size,
+                                          workers=args.workers, writer=writer)
+            state_mgr.save()
+            print(f"[OK] Embedded {processed_count} files, waiting for more...", flush=True)
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopping embedding worker")
+    finally:
+        server.shutdown()
+        server.server_close()
+        writer.shutdown(wait=True)
+        embedder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,24 +10,32 @@ Usage:
 """
 import sys
 import os
+import socket
 import argparse
 from pathlib import Path
 from datetime import datetime
-import yaml
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.ingest.gmail_connector import GmailConnector
-from src.ingest.mcp_gmail_connector import MCPGmailConnector
 from src.utils.state_manager import StateManager
+from src.utils.config_loader import load_config
 
 
-def load_config():
-    """Load configuration from config.yaml"""
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+def notify_embed_worker(config: dict) -> bool:
+    """
+    Ask a running embed_worker.py to scan for new raw files now.
+    
+    Returns:
+        True if a worker acknowledged, False if none is listening
+    """
+    port = config.get('embed_worker', {}).get('port', 8766)
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=1) as conn:
+            conn.sendall(b"scan\n")
+            return conn.recv(16).startswith(b"ok")
+    except OSError:
+        return False
 
 
 def parse_arguments(default_mode='mcp'):
@@ -50,6 +58,17 @@ def parse_arguments(default_mode='mcp'):
         action='store_true',
         help='Force full ingestion (ignore last state)'
     )
+    parser.add_argument(
+        '--also-sync-kb',
+        action='store_true',
+        help='Sync Knowledge Base identities from the fetched messages right away'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=None,
+        help='Messages per Gmail batch request, at most 100 (overrides config)'
+    )
     return parser.parse_args()
 
 
@@ -76,13 +95,17 @@ def main():
     
     # Override max_results if provided
     max_results = args.max_results if args.max_results else gmail_config.get('max_results', 100)
+    batch_size = args.batch_size if args.batch_size else gmail_config.get('batch_size', 100)
     
-    # Initialize connector based on mode
+    # Initialize connector based on mode; the Google client libraries are
+    # only imported once a connector is actually needed
     if args.mode == 'mcp':
+        from src.ingest.mcp_gmail_connector import MCPGmailConnector
         print("[MCP] Using MCP connector")
         connector = MCPGmailConnector(gmail_config)
         use_mcp = True
     else:
+        from src.ingest.gmail_connector import GmailConnector
         print("[LEGACY] Using legacy connector")
         connector = GmailConnector(gmail_config)
         use_mcp = False
@@ -122,14 +145,17 @@ def main():
         messages = connector.fetch_messages_sync(
             max_results=max_results, 
             since_date=since_date, 
-            since_id=since_id
+            since_id=since_id,
+            batch_size=batch_size
         )
     else:
         messages = connector.fetch_messages(
             max_results=max_results,
             since_date=since_date,
-            since_id=since_id
+            since_id=since_id,
+            batch_size=batch_size
         )
+    connector.close()
     
     if not messages:
         print("No new messages fetched.")
@@ -153,6 +179,16 @@ def main():
         "last_id": newest_msg['id']
     })
     
+    # Reuse the messages already in memory instead of re-reading the dump
+    if args.also_sync_kb:
+        from sync_kb import ingest_messages_to_kb
+        from src.storage.knowledge_base import KnowledgeBase
+        
+        print()
+        print("Step 4: Syncing Knowledge Base identities...")
+        new_identities, resolved_count = ingest_messages_to_kb(messages, KnowledgeBase(), state_mgr, platform)
+        print(f"[OK] {new_identities} new identities, {resolved_count} existing identities resolved")
+    
     print()
     print("=" * 80)
     print("[OK] Ingestion complete!")
@@ -162,7 +198,10 @@ def main():
     print(f"   Updated state: {newest_msg['date']}")
     print("=" * 80)
     print()
-    print("Next step: Run 'python scripts/embed.py' to generate embeddings")
+    if notify_embed_worker(config):
+        print("[INFO] Embedding worker notified, new messages will be embedded shortly")
+    else:
+        print("Next step: Run 'python scripts/embed.py' to generate embeddings")
 
 
 if __name__ == "__main__":
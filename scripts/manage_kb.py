@@ -3,6 +3,7 @@ Management CLI for the DidI Knowledge Base.
 Allows manual mapping of people, organizations, and aliases.
 """
 import sys
+import csv
 import argparse
 from pathlib import Path
 
@@ -11,14 +12,41 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.storage.knowledge_base import KnowledgeBase
 
+ENTITY_TYPES = ['person', 'organization', 'group']
+
+
+def read_entities_csv(path: str) -> list:
+    """
+    Read entities from a CSV with a header row: name[,type][,dept][,role].
+    
+    Returns:
+        (name, type, metadata) tuples for KnowledgeBase.add_entities_bulk
+    """
+    rows = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for line_no, record in enumerate(csv.DictReader(f), start=2):
+            name = (record.get('name') or '').strip()
+            if not name:
+                print(f"[WARN] Line {line_no}: missing name, skipped")
+                continue
+            entity_type = (record.get('type') or 'person').strip()
+            if entity_type not in ENTITY_TYPES:
+                print(f"[WARN] Line {line_no}: unknown type '{entity_type}', skipped")
+                continue
+            metadata = {k: record[k].strip() for k in ('dept', 'role') if (record.get(k) or '').strip()}
+            rows.append((name, entity_type, metadata))
+    return rows
+
+
 def main():
     parser = argparse.ArgumentParser(description="Manage DidI Knowledge Base (Identities & Orgs)")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
 
     # Add Entity
     add_ep = subparsers.add_parser("add-entity", help="Add a new person or organization")
-    add_ep.add_argument("name", help="Canonical name (e.g., 'Alice Smith')")
-    add_ep.add_argument("--type", choices=['person', 'organization', 'group'], default='person')
+    add_ep.add_argument("name", nargs="?", help="Canonical name (e.g., 'Alice Smith')")
+    add_ep.add_argument("--type", choices=ENTITY_TYPES, default='person')
+    add_ep.add_argument("--from-file", help="CSV (name,type,dept,role) to add many entities in one transaction")
     add_ep.add_argument("--dept", help="Department")
     add_ep.add_argument("--role", help="Role")
 
@@ -35,13 +63,22 @@ def main():
 
     # List
     list_e = subparsers.add_parser("list", help="List entities")
-    list_e.add_argument("--type", choices=['person', 'organization', 'group'])
+    list_e.add_argument("--type", choices=ENTITY_TYPES)
 
     args = parser.parse_args()
     
     kb = KnowledgeBase()
 
-    if args.command == "add-entity":
+    if args.command == "add-entity" and args.from_file:
+        rows = read_entities_csv(args.from_file)
+        entity_ids = kb.add_entities_bulk(rows)
+        for (name, entity_type, _), eid in zip(rows, entity_ids):
+            print(f"  {eid}  {entity_type:<12} {name}")
+        print(f"[OK] Added {len(entity_ids)} entities from {args.from_file}")
+
+    elif args.command == "add-entity":
+        if not args.name:
+            parser.error("add-entity needs a name or --from-file")
         metadata = {}
         if args.dept: metadata['dept'] = args.dept
         if args.role: metadata['role'] = args.role
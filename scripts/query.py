@@ -7,22 +7,37 @@ Usage:
     python scripts/query.py "What did I discuss about the Q4 budget?"
 """
 import sys
+import json
+import socket
 from pathlib import Path
-import yaml
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.embeddings.embedder import Embedder
-from src.storage.vector_store import VectorStore
 from src.retrieval.search import SearchEngine
+from src.utils.config_loader import load_config
 
 
-def load_config():
-    """Load configuration from config.yaml"""
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+def query_via_daemon(query: str, n_results: int, port: int):
+    """
+    Run the search on a running query_daemon.py.
+    
+    Returns:
+        List of results, or None if no daemon is listening or it failed
+    """
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5) as conn:
+            conn.settimeout(60)
+            conn.sendall(json.dumps({"query": query, "n_results": n_results}).encode('utf-8') + b"\n")
+            with conn.makefile('rb') as reply:
+                response = json.loads(reply.readline())
+    except (OSError, ValueError):
+        return None
+    
+    if 'error' in response:
+        print(f"[WARN] Query daemon error: {response['error']}, searching locally")
+        return None
+    return response['results']
 
 
 def main():
@@ -47,26 +62,42 @@ def main():
     config = load_config()
     embeddings_config = config['embeddings']
     storage_config = config['storage']
+    n_results = 3
     
-    # Initialize components
-    print("🔄 Initializing search engine...")
-    
-    embedder = Embedder(model_name=embeddings_config['model_name'])
-    
-    vector_store = VectorStore(
-        persist_directory=storage_config['chromadb_path'],
-        collection_name=storage_config['collection_name']
-    )
+    # A running query daemon already has the model loaded
+    port = config.get('query_daemon', {}).get('port', 8767)
+    results = query_via_daemon(query, n_results, port)
     
-    search_engine = SearchEngine(vector_store, embedder)
-    
-    print()
-    
-    # Perform search
-    results = search_engine.search(query, n_results=3)
+    if results is not None:
+        print(f"🔍 Searching for: '{query}' (via query daemon)")
+    else:
+        # Initialize components
+        print("🔄 Initializing search engine...")
+        
+        # Imported here so the daemon path never loads torch or chromadb
+        from src.embeddings.embedder import Embedder
+        from src.storage.vector_store import VectorStore
+        
+        embedder = Embedder(model_name=embeddings_config['model_name'],
+                            device=embeddings_config.get('device'),
+                            precision=embeddings_config.get('precision', 'auto'),
+                            backend=embeddings_config.get('backend', 'torch'),
+                            num_threads=embeddings_config.get('num_threads'))
+        
+        vector_store = VectorStore(
+            persist_directory=storage_config['chromadb_path'],
+            collection_name=storage_config['collection_name']
+        )
+        
+        search_engine = SearchEngine(vector_store, embedder)
+        
+        print()
+        
+        # Perform search
+        results = search_engine.search(query, n_results=n_results)
     
     # Display results
-    print(search_engine.format_results_for_display(results))
+    print(SearchEngine.format_results_for_display(results))
     
     print("=" * 80)
     print("💡 Tip: Refine your search by being more specific!")
@@ -0,0 +1,91 @@
+"""
+Query daemon - keep the embedding model and ChromaDB loaded between searches.
+Path: scripts/query_daemon.py
+
+Usage:
+    python scripts/query_daemon.py            # Serve on 127.0.0.1 (query_daemon.port)
+    python scripts/query_daemon.py --port 9000
+
+While it runs, scripts/query.py sends its search here instead of loading
+the model itself, so each query costs only the search. Protocol: one JSON
+line in ({"query": ..., "n_results": ...}), one JSON line out
+({"results": [...]} or {"error": ...}).
+"""
+import sys
+import json
+import socketserver
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.embeddings.embedder import Embedder
+from src.storage.vector_store import VectorStore
+from src.retrieval.search import SearchEngine
+from src.utils.config_loader import load_config
+
+DEFAULT_PORT = 8767
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Answer one search request per connection"""
+    
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            results = self.server.search_engine.search(
+                request['query'], n_results=int(request.get('n_results', 3))
+            )
+            response = {"results": results}
+        except Exception as e:
+            print(f"[ERROR] Query failed: {e}")
+            response = {"error": str(e)}
+        self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b"\n")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve memory searches from a warm model")
+    parser.add_argument("--port", type=int, default=None,
+                        help=f"Localhost port to listen on (default: query_daemon.port or {DEFAULT_PORT})")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("Did-I - Query Daemon")
+    print("=" * 80)
+    print()
+    
+    config = load_config()
+    embeddings_config = config['embeddings']
+    storage_config = config['storage']
+    port = args.port or config.get('query_daemon', {}).get('port', DEFAULT_PORT)
+    
+    print("🔄 Initializing search engine...")
+    embedder = Embedder(model_name=embeddings_config['model_name'],
+                        device=embeddings_config.get('device'),
+                        precision=embeddings_config.get('precision', 'auto'),
+                        backend=embeddings_config.get('backend', 'torch'),
+                        num_threads=embeddings_config.get('num_threads'),
+                        normalize_queries=embeddings_config.get('normalized_query_cache', False),
+                        compile_model=embeddings_config.get('compile', False))
+    vector_store = VectorStore(
+        persist_directory=storage_config['chromadb_path'],
+        collection_name=storage_config['collection_name']
+    )
+    
+    # Requests are served one at a time; the model and ChromaDB client are
+    # shared, and a search is short compared to the load this avoids
+    socketserver.TCPServer.allow_reuse_address = True
+    with socketserver.TCPServer(("127.0.0.1", port), _QueryHandler) as server:
+        server.search_engine = SearchEngine(vector_store, embedder)
+        print()
+        print(f"[OK] Listening on 127.0.0.1:{port}")
+        print("   Press Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[INFO] Stopping query daemon")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,8 @@ Path: scripts/sync_kb.py
 """
 import sys
 import os
-import json
-import yaml
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from datetime import datetime
 
@@ -14,12 +14,97 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.storage.knowledge_base import KnowledgeBase
 from src.utils.state_manager import StateManager
+from src.utils.raw_data import iter_raw_messages, list_raw_files
+from src.utils.config_loader import load_config
+
+
+def collect_senders(messages, last_date: str):
+    """
+    Collect the senders of messages newer than last_date.
+    
+    Args:
+        messages: Iterable of normalized messages
+        last_date: ISO date of the last synced message
+    
+    Returns:
+        (senders, message_counts, max_date): email -> first name seen,
+        email -> number of new messages, and the newest message date
+    """
+    senders = {}
+    message_counts = {}
+    max_date = last_date
+    
+    # Already-synced messages are skipped before anything else is read
+    for msg in messages:
+        msg_date = msg.get('date', '')
+        if msg_date <= last_date:
+            continue
+        
+        if msg_date > max_date:
+            max_date = msg_date
+            
+        sender = msg.get('from', {})
+        email = sender.get('email', '')
+        name = sender.get('name', '') or email
+        
+        if not email:
+            continue
+        
+        senders.setdefault(email, name)
+        message_counts[email] = message_counts.get(email, 0) + 1
+    
+    return senders, message_counts, max_date
+
+
+def scan_file(file_path: Path, last_date: str):
+    """
+    Collect the senders of messages newer than last_date in one raw dump.
+    
+    Messages are streamed so a large dump never sits in memory as a whole.
+    """
+    return collect_senders(iter_raw_messages(file_path), last_date)
+
+
+def add_new_identities(kb: KnowledgeBase, senders: dict, message_counts: dict):
+    """
+    Add every sender the Knowledge Base does not know yet.
+    
+    Returns:
+        (new_identities, resolved_count)
+    """
+    # One bulk lookup, then every new identity in a single transaction
+    known = kb.resolve_identities_bulk(list(senders))
+    new_senders = [(name, email) for email, name in senders.items() if email not in known]
+    kb.add_identities_bulk(new_senders)
+    for name, email in new_senders:
+        print(f"  [NEW] Added identity: {name} <{email}>")
+    
+    new_identities = len(new_senders)
+    return new_identities, sum(message_counts.values()) - new_identities
+
+
+def ingest_messages_to_kb(messages, kb: KnowledgeBase, state_mgr: StateManager, platform: str = "gmail"):
+    """
+    Sync identities from messages that are already in memory.
+    
+    Lets ingest.py update the Knowledge Base right after fetching, without
+    reading the raw dump it just wrote back from disk.
+    
+    Returns:
+        (new_identities, resolved_count)
+    """
+    last_sync = state_mgr.get_state("kb_sync", platform, {})
+    last_date = last_sync.get("last_date", "1970-01-01")
+    
+    senders, message_counts, max_msg_date = collect_senders(messages, last_date)
+    new_identities, resolved_count = add_new_identities(kb, senders, message_counts)
+    
+    state_mgr.update_state("kb_sync", platform, {
+        "last_date": max_msg_date,
+        "sync_timestamp": datetime.now().isoformat()
+    })
+    return new_identities, resolved_count
 
-def load_config():
-    """Load configuration from config.yaml"""
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
 
 def main():
     print("=" * 80)
@@ -44,50 +129,60 @@ def main():
     
     # Find all raw files
     raw_dir = Path(paths_config['raw_data'])
-    json_files = sorted(list(raw_dir.glob("gmail_*.json")), key=lambda p: p.stat().st_mtime)
+    json_files = list_raw_files(raw_dir, prefix=f"{platform}_")
     
     if not json_files:
         print("[ERROR] No data files found.")
         return
 
-    new_identities = 0
-    resolved_count = 0
     max_msg_date = last_date
     
+    # Files whose size and mtime match the last sync were fully scanned then
+    manifest = last_sync.get("processed_files", {})
+    new_manifest = {}
+    files_to_scan = []
     for file_path in json_files:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        messages = data.get('messages', [])
-        for msg in messages:
-            msg_date = msg.get('date', '')
-            if msg_date <= last_date:
-                continue
-            
-            if msg_date > max_msg_date:
-                max_msg_date = msg_date
-                
-            sender = msg.get('from', {})
-            email = sender.get('email', '')
-            name = sender.get('name', '') or email
-            
-            if not email:
-                continue
-                
-            # Try to resolve
-            identity = kb.resolve_identity(email)
-            if not identity:
-                # Add as new entity
-                eid = kb.add_entity(name, 'person')
-                kb.add_alias(eid, email, 'email')
-                print(f"  [NEW] Added identity: {name} <{email}>")
-                new_identities += 1
-            else:
-                resolved_count += 1
+        st = file_path.stat()
+        key = str(file_path.resolve())
+        previous = manifest.get(key)
+        if previous and previous[:2] == [st.st_size, st.st_mtime_ns]:
+            new_manifest[key] = previous
+        else:
+            files_to_scan.append((file_path, key, st))
+    
+    skipped = len(json_files) - len(files_to_scan)
+    if skipped:
+        print(f"[INFO] Skipping {skipped} unchanged files")
+    
+    # Pass 1: collect unique sender emails (first name seen wins) and how
+    # many new messages each one sent. Files are independent, so they are
+    # parsed in parallel and merged here in file order.
+    senders = {}
+    message_counts = {}
+    paths = [file_path for file_path, _, _ in files_to_scan]
+    workers = min(len(paths), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            scans = list(ex.map(scan_file, paths, repeat(last_date)))
+    else:
+        scans = [scan_file(f, last_date) for f in paths]
+    
+    for (_, key, st), (file_senders, file_counts, file_max_date) in zip(files_to_scan, scans):
+        new_manifest[key] = [st.st_size, st.st_mtime_ns, file_max_date]
+        for email, name in file_senders.items():
+            senders.setdefault(email, name)
+        for email, count in file_counts.items():
+            message_counts[email] = message_counts.get(email, 0) + count
+        if file_max_date > max_msg_date:
+            max_msg_date = file_max_date
+    
+    # Pass 2: add the senders the Knowledge Base does not know yet
+    new_identities, resolved_count = add_new_identities(kb, senders, message_counts)
     
     # Update state
     state_mgr.update_state("kb_sync", platform, {
         "last_date": max_msg_date,
+        "processed_files": new_manifest,
         "sync_timestamp": datetime.now().isoformat()
     })
     
@@ -5,8 +5,13 @@ Shows what tables and data ChromaDB stores in SQLite.
 import sqlite3
 from pathlib import Path
 
+def quote_ident(name: str) -> str:
+    """Quote a table name for interpolation into SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
 # Connect to ChromaDB's SQLite database
-db_path = Path(__file__).parent.parent / "data" / "chromadb" / "chroma.sqlite3"
+db_path = Path(__file__).parent.parent.parent / "data" / "chromadb" / "chroma.sqlite3"
 conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
@@ -15,35 +20,44 @@ print("ChromaDB SQLite Database Structure")
 print("=" * 80)
 print()
 
-# Get all tables
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-tables = cursor.fetchall()
+# All tables and their columns in one query (pragma_table_info as a table-valued function)
+cursor.execute("""
+    SELECT m.name, p.name, p.type
+    FROM sqlite_master m
+    JOIN pragma_table_info(m.name) p
+    WHERE m.type = 'table'
+    ORDER BY m.rowid, p.cid
+""")
+columns_by_table = {}
+for table_name, col_name, col_type in cursor.fetchall():
+    columns_by_table.setdefault(table_name, []).append((col_name, col_type))
 
-print(f"Found {len(tables)} tables:")
+# Row counts for every table in one query
+counts = {}
+if columns_by_table:
+    count_sql = " UNION ALL ".join(
+        f"SELECT ?, COUNT(*) FROM {quote_ident(name)}" for name in columns_by_table
+    )
+    cursor.execute(count_sql, list(columns_by_table))
+    counts = dict(cursor.fetchall())
+
+print(f"Found {len(columns_by_table)} tables:")
 print()
 
-for table in tables:
-    table_name = table[0]
+for table_name, columns in columns_by_table.items():
     print(f"Table: {table_name}")
     print("-" * 80)
     
-    # Get table schema
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    columns = cursor.fetchall()
-    
     print("Columns:")
-    for col in columns:
-        col_id, col_name, col_type, not_null, default, pk = col
+    for col_name, col_type in columns:
         print(f"  - {col_name} ({col_type})")
     
-    # Get row count
-    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-    count = cursor.fetchone()[0]
+    count = counts[table_name]
     print(f"Row count: {count}")
     
     # Show sample data for small tables
     if count > 0 and count <= 5:
-        cursor.execute(f"SELECT * FROM {table_name} LIMIT 3")
+        cursor.execute(f"SELECT * FROM {quote_ident(table_name)} LIMIT 3")
         rows = cursor.fetchall()
         print("Sample data:")
         for row in rows:
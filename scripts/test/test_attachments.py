@@ -1,18 +1,14 @@
 import sys
 import os
 from pathlib import Path
-import yaml
 
 # Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.ingest.gmail_connector import GmailConnector
 from src.preprocessing.chunker import TextChunker
+from src.utils.config_loader import load_config
 
-def load_config():
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
 
 def test_attachments():
     print("Step 1: Initializing Gmail Connector...")
@@ -38,14 +34,10 @@ def test_attachments():
             print("Fetching regular messages instead...")
             messages = connector.fetch_messages(max_results=5)
         else:
-            messages = []
-            for m in msg_ids:
-                full_msg = connector.service.users().messages().get(
-                    userId='me',
-                    id=m['id'],
-                    format='full'
-                ).execute()
-                messages.append(connector.normalize_message(full_msg))
+            # One batch request for all IDs instead of a get() per message
+            full_messages = connector._get_messages_batch([m['id'] for m in msg_ids])
+            messages = [connector.normalize_message(full_messages[m['id']])
+                        for m in msg_ids if m['id'] in full_messages]
     except Exception as e:
         print(f"Error fetching: {e}")
         return
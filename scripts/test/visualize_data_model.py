@@ -2,97 +2,110 @@
 Visual demonstration of Vector-Document-Metadata relationships.
 Creates a diagram showing how ID links all three layers.
 """
+import sys
 
-print("=" * 80)
-print("DATA MODEL: How ID Links Vector, Document, and Metadata")
-print("=" * 80)
-print()
 
-# Example message
-message_id = "gmail_abc123"
+def main():
+    # Build the whole diagram, then write it to stdout in one call
+    lines = []
+    
+    lines.append("=" * 80)
+    lines.append("DATA MODEL: How ID Links Vector, Document, and Metadata")
+    lines.append("=" * 80)
+    lines.append("")
+    
+    # Example message
+    message_id = "gmail_abc123"
+    
+    lines.append(f"Message ID: {message_id}")
+    lines.append("")
+    lines.append("This single ID links three data layers:")
+    lines.append("")
+    
+    # Layer 1: Document
+    lines.append("┌" + "─" * 78 + "┐")
+    lines.append("│ LAYER 1: DOCUMENT (Full Text)                                             │")
+    lines.append("├" + "─" * 78 + "┤")
+    lines.append(f"│ ID: {message_id:<70} │")
+    lines.append("│ Document: 'Q4 Budget Discussion We need to finalize the budget by...'     │")
+    lines.append("│ Storage: ChromaDB documents table                                         │")
+    lines.append("│ Purpose: Full-text display, keyword search                                │")
+    lines.append("│ Size: ~1 KB per message                                                   │")
+    lines.append("└" + "─" * 78 + "┘")
+    lines.append("                                    ↓")
+    lines.append("                          (linked by same ID)")
+    lines.append("                                    ↓")
+    
+    # Layer 2: Vector
+    lines.append("┌" + "─" * 78 + "┐")
+    lines.append("│ LAYER 2: VECTOR (Semantic Embedding)                                      │")
+    lines.append("├" + "─" * 78 + "┤")
+    lines.append(f"│ ID: {message_id:<70} │")
+    lines.append("│ Vector: [0.123, -0.456, 0.789, ..., 0.234] (384 dimensions)               │")
+    lines.append("│ Storage: DuckDB/binary files in data/chromadb/[uuid]/                     │")
+    lines.append("│ Purpose: Semantic similarity search (cosine distance)                     │")
+    lines.append("│ Size: ~1.5 KB per message                                                 │")
+    lines.append("└" + "─" * 78 + "┘")
+    lines.append("                                    ↓")
+    lines.append("                          (linked by same ID)")
+    lines.append("                                    ↓")
+    
+    # Layer 3: Metadata
+    lines.append("┌" + "─" * 78 + "┐")
+    lines.append("│ LAYER 3: METADATA (Structured Attributes)                                 │")
+    lines.append("├" + "─" * 78 + "┤")
+    lines.append(f"│ ID: {message_id:<70} │")
+    lines.append("│ Metadata:                                                                  │")
+    lines.append("│   - platform: 'gmail'                                                      │")
+    lines.append("│   - sender_email: 'alice@example.com'                                      │")
+    lines.append("│   - sender_name: 'Alice Smith'                                             │")
+    lines.append("│   - date: '2024-12-20T15:30:00'                                            │")
+    lines.append("│   - subject: 'Q4 Budget Discussion'                                        │")
+    lines.append("│   - thread_id: 'thread_abc123'                                             │")
+    lines.append("│   - url: 'https://mail.google.com/...'                                     │")
+    lines.append("│   - type: 'email'                                                          │")
+    lines.append("│ Storage: SQLite (embedding_metadata table)                                 │")
+    lines.append("│ Purpose: Filtering, sorting, faceted search                                │")
+    lines.append("│ Size: ~17 KB per message (with indexes)                                    │")
+    lines.append("└" + "─" * 78 + "┘")
+    
+    lines.append("")
+    lines.append("=" * 80)
+    lines.append("QUERY EXAMPLE: How the layers work together")
+    lines.append("=" * 80)
+    lines.append("")
+    
+    lines.append("Query: 'What did Alice say about the budget in December?'")
+    lines.append("")
+    
+    lines.append("Step 1: VECTOR SEARCH (Semantic)")
+    lines.append("  - Embed query: 'budget discussion' → [0.5, -0.3, ...]")
+    lines.append("  - Compute cosine similarity with all 100 message vectors")
+    lines.append("  - Return top 50 candidates by similarity")
+    lines.append("  → Candidate IDs: ['gmail_abc123', 'gmail_def456', ...]")
+    lines.append("")
+    
+    lines.append("Step 2: METADATA FILTER (Structured)")
+    lines.append("  - SQL query on SQLite:")
+    lines.append("    WHERE sender_name = 'Alice'")
+    lines.append("    AND date LIKE '2024-12%'")
+    lines.append("    AND id IN (candidate_ids)")
+    lines.append("  → Filtered IDs: ['gmail_abc123', 'gmail_xyz789']")
+    lines.append("")
+    
+    lines.append("Step 3: RETRIEVE DOCUMENTS (Display)")
+    lines.append("  - Fetch full text for filtered IDs")
+    lines.append("  - Return to user with metadata")
+    lines.append("  → Results: 2 messages from Alice about budget in December")
+    lines.append("")
+    
+    lines.append("=" * 80)
+    lines.append("KEY INSIGHT: ID is the PRIMARY KEY linking all three layers")
+    lines.append("=" * 80)
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
-print(f"Message ID: {message_id}")
-print()
-print("This single ID links three data layers:")
-print()
 
-# Layer 1: Document
-print("┌" + "─" * 78 + "┐")
-print("│ LAYER 1: DOCUMENT (Full Text)                                             │")
-print("├" + "─" * 78 + "┤")
-print(f"│ ID: {message_id:<70} │")
-print("│ Document: 'Q4 Budget Discussion We need to finalize the budget by...'     │")
-print("│ Storage: ChromaDB documents table                                         │")
-print("│ Purpose: Full-text display, keyword search                                │")
-print("│ Size: ~1 KB per message                                                   │")
-print("└" + "─" * 78 + "┘")
-print("                                    ↓")
-print("                          (linked by same ID)")
-print("                                    ↓")
-
-# Layer 2: Vector
-print("┌" + "─" * 78 + "┐")
-print("│ LAYER 2: VECTOR (Semantic Embedding)                                      │")
-print("├" + "─" * 78 + "┤")
-print(f"│ ID: {message_id:<70} │")
-print("│ Vector: [0.123, -0.456, 0.789, ..., 0.234] (384 dimensions)               │")
-print("│ Storage: DuckDB/binary files in data/chromadb/[uuid]/                     │")
-print("│ Purpose: Semantic similarity search (cosine distance)                     │")
-print("│ Size: ~1.5 KB per message                                                 │")
-print("└" + "─" * 78 + "┘")
-print("                                    ↓")
-print("                          (linked by same ID)")
-print("                                    ↓")
-
-# Layer 3: Metadata
-print("┌" + "─" * 78 + "┐")
-print("│ LAYER 3: METADATA (Structured Attributes)                                 │")
-print("├" + "─" * 78 + "┤")
-print(f"│ ID: {message_id:<70} │")
-print("│ Metadata:                                                                  │")
-print("│   - platform: 'gmail'                                                      │")
-print("│   - sender_email: 'alice@example.com'                                      │")
-print("│   - sender_name: 'Alice Smith'                                             │")
-print("│   - date: '2024-12-20T15:30:00'                                            │")
-print("│   - subject: 'Q4 Budget Discussion'                                        │")
-print("│   - thread_id: 'thread_abc123'                                             │")
-print("│   - url: 'https://mail.google.com/...'                                     │")
-print("│   - type: 'email'                                                          │")
-print("│ Storage: SQLite (embedding_metadata table)                                 │")
-print("│ Purpose: Filtering, sorting, faceted search                                │")
-print("│ Size: ~17 KB per message (with indexes)                                    │")
-print("└" + "─" * 78 + "┘")
-
-print()
-print("=" * 80)
-print("QUERY EXAMPLE: How the layers work together")
-print("=" * 80)
-print()
-
-print("Query: 'What did Alice say about the budget in December?'")
-print()
-
-print("Step 1: VECTOR SEARCH (Semantic)")
-print("  - Embed query: 'budget discussion' → [0.5, -0.3, ...]")
-print("  - Compute cosine similarity with all 100 message vectors")
-print("  - Return top 50 candidates by similarity")
-print("  → Candidate IDs: ['gmail_abc123', 'gmail_def456', ...]")
-print()
-
-print("Step 2: METADATA FILTER (Structured)")
-print("  - SQL query on SQLite:")
-print("    WHERE sender_name = 'Alice'")
-print("    AND date LIKE '2024-12%'")
-print("    AND id IN (candidate_ids)")
-print("  → Filtered IDs: ['gmail_abc123', 'gmail_xyz789']")
-print()
-
-print("Step 3: RETRIEVE DOCUMENTS (Display)")
-print("  - Fetch full text for filtered IDs")
-print("  - Return to user with metadata")
-print("  → Results: 2 messages from Alice about budget in December")
-print()
-
-print("=" * 80)
-print("KEY INSIGHT: ID is the PRIMARY KEY linking all three layers")
-print("=" * 80)
+if __name__ == "__main__":
+    main()
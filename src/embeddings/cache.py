@@ -0,0 +1,84 @@
+"""
+Persistent embedding cache keyed by content hash.
+Path: src/embeddings/cache.py
+"""
+import hashlib
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Store text -> embedding vectors in SQLite so identical texts (quoted
+    replies, signatures, re-ingested files) are only embedded once.
+    
+    Keys hash the model name together with the text, so switching models
+    never returns vectors from another embedding space. Vectors are stored
+    as float16 (half the disk and I/O; cosine scores move by well under
+    0.1%) and returned as float32.
+    """
+    
+    # Keep IN (...) lists well under SQLite's bound-parameter limit
+    _LOOKUP_CHUNK = 500
+    
+    def __init__(self, db_path: str = "./data/embed_cache.db", model_name: str = ""):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            db_path: Path to the SQLite cache file
+            model_name: Embedding model the cached vectors belong to
+        """
+        self.db_path = db_path
+        self.model_name = model_name
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        
+        self.conn = sqlite3.connect(db_path)
+        # Cache writes are re-creatable, so skip the per-commit fsync
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                vector BLOB NOT NULL  -- float16
+            )
+        ''')
+        self.conn.commit()
+    
+    def key(self, text: str) -> bytes:
+        """Content hash for a text under this cache's model"""
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode('utf-8'), digest_size=16).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up several keys at once.
+        
+        Returns:
+            Mapping of found keys to their vectors (misses are absent)
+        """
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), self._LOOKUP_CHUNK):
+            chunk = unique[i:i + self._LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            )
+            for key, blob in cursor:
+                found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+    
+    def put_many(self, items: Iterable[Tuple[bytes, np.ndarray]]):
+        """Insert or replace vectors in a single transaction"""
+        rows = [(key, np.asarray(vec, dtype=np.float16).tobytes()) for key, vec in items]
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+    
+    def close(self):
+        """Close the underlying database connection"""
+        self.conn.close()
@@ -2,26 +2,279 @@
 Embedding generator using sentence-transformers.
 Path: src/embeddings/embedder.py
 """
-from typing import List, Union
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Union
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
+from .cache import EmbeddingCache
+
+PRECISIONS = ('auto', 'fp32', 'fp16', 'bf16')
+BACKENDS = ('torch', 'onnx')
+
+# BERT-class encoders scale poorly past ~8 intra-op threads
+DEFAULT_CPU_THREADS = min(8, os.cpu_count() or 1)
+
+# encode() keeps every minibatch's output on the device until it returns, so
+# very long text lists are fed to it in windows of this many texts
+ENCODE_WINDOW = 4096
+
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-folded form of a query, used as its cache key"""
+    return ' '.join(text.lower().split())
+
+
+def detect_device() -> str:
+    """Pick the fastest available torch device: CUDA > MPS > CPU"""
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+class _OnnxEncoder:
+    """
+    Int8-quantized ONNX Runtime copy of a sentence-transformers model.
+    
+    Exposes the subset of SentenceTransformer.encode() the Embedder uses and
+    reproduces mean pooling (+ optional L2 normalization), so vectors keep
+    the same shape as the torch path.
+    """
+    
+    QUANTIZED_FILE = "model_quantized.onnx"
+    
+    def __init__(self, model_name: str, cache_dir: str, device: str,
+                 max_seq_length: int, normalize: bool, num_threads: int = DEFAULT_CPU_THREADS):
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        export_dir = Path(cache_dir) / model_name.replace('/', '__')
+        quantized_dir = export_dir / "int8"
+        
+        if not (quantized_dir / self.QUANTIZED_FILE).exists():
+            # One-time export + dynamic quantization, reused on later runs
+            print(f"[INFO] Exporting {model_name} to ONNX (int8) in {quantized_dir}")
+            ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+            quantizer = ORTQuantizer.from_pretrained(export_dir)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=quantized_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(quantized_dir)
+        
+        # Full graph fusion (attention, GELU, LayerNorm) and the same thread
+        # budget as the torch path
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = num_threads
+        
+        provider = 'CUDAExecutionProvider' if device.startswith('cuda') else 'CPUExecutionProvider'
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            quantized_dir, file_name=self.QUANTIZED_FILE, provider=provider,
+            session_options=session_options
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(quantized_dir)
+        self.max_seq_length = max_seq_length
+        self.normalize = normalize
+    
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        
+        # Batch texts of similar length together so padding stays short,
+        # as SentenceTransformer.encode does; the order is restored below
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+        
+        batches = []
+        for start in range(0, len(sorted_texts), batch_size):
+            tokens = self.tokenizer(
+                sorted_texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors='np'
+            )
+            hidden = self.model(**tokens).last_hidden_state
+            
+            # Mean pooling over non-padding tokens
+            mask = tokens['attention_mask'][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled)
+        
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=batches[0].dtype)
+        embeddings[order] = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
+
 
 class Embedder:
     """Generate embeddings for text using sentence-transformers"""
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 query_cache_size: int = 1024,
+                 device: Optional[str] = None,
+                 precision: str = "auto",
+                 backend: str = "torch",
+                 onnx_cache_dir: str = "./data/models/onnx",
+                 num_threads: Optional[int] = None,
+                 cache_path: Optional[str] = None,
+                 normalize_queries: bool = False,
+                 compile_model: bool = False):
         """
         Initialize embedder with specified model.
         
         Args:
             model_name: Name of sentence-transformers model
+            query_cache_size: Max number of single-text embeddings kept in memory (0 disables)
+            device: Torch device ('cuda', 'mps', 'cpu'); None picks the fastest available
+            precision: Weight precision ('auto', 'fp32', 'fp16', 'bf16'); 'auto' uses
+                fp16 on CUDA and fp32 elsewhere (torch backend only)
+            backend: 'torch' or 'onnx' (int8-quantized ONNX Runtime; falls back
+                to torch when optimum/onnxruntime are unavailable)
+            onnx_cache_dir: Where the exported ONNX model is kept between runs
+            num_threads: Torch / ONNX Runtime intra-op threads on CPU (default: min(8, CPU count))
+            cache_path: SQLite file for the content-hash embedding cache used by
+                embed_batch (None disables it)
+            normalize_queries: Key the query cache on case- and whitespace-folded
+                text, so queries differing only in those share one model call
+                (meant for uncased models such as all-MiniLM-L6-v2)
+            compile_model: Compile the transformer with torch.compile (torch
+                backend, PyTorch 2.x); pays off for long embedding runs
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
         self.model_name = model_name
+        self.query_cache_size = query_cache_size
+        self.normalize_queries = normalize_queries
+        self._query_cache = OrderedDict()  # query key -> embedding, LRU order
         print(f"[INFO] Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model = SentenceTransformer(model_name, device=device or detect_device())
+        self.device = str(self.model.device)
+        if self.device == 'cpu':
+            self._configure_cpu_threads(num_threads or DEFAULT_CPU_THREADS)
+        
+        self.backend = 'torch'
+        self._encoder = self.model
+        if backend == 'onnx':
+            self._encoder = self._load_onnx_encoder(onnx_cache_dir, num_threads or DEFAULT_CPU_THREADS)
+            if self._encoder is not self.model:
+                self.backend = 'onnx'
+        
+        self.precision = self._apply_precision(precision) if self.backend == 'torch' else 'int8'
+        self.compiled = compile_model and self.backend == 'torch' and self._compile_model()
+        
+        self.cache = None
+        if cache_path:
+            # Quantized ONNX vectors differ slightly; keep them apart from torch ones
+            self.cache = EmbeddingCache(db_path=cache_path, model_name=f"{model_name}:{self.backend}")
+        
+        # Looked up once: the dimension getter walks the module list
+        self._dim = self.model.get_sentence_embedding_dimension()
+        self._zero = np.zeros(self._dim, dtype=np.float32)
         print(f"[OK] Model loaded successfully!")
-        print(f"   Embedding dimension: {self.model.get_sentence_embedding_dimension()}")
+        print(f"   Device: {self.device}")
+        print(f"   Backend: {self.backend}")
+        print(f"   Precision: {self.precision}")
+        if self.compiled:
+            print("   Compiled: torch.compile")
+        print(f"   Embedding dimension: {self._dim}")
+        if self.cache is not None:
+            print(f"   Embedding cache: {cache_path}")
+    
+    @staticmethod
+    def _configure_cpu_threads(num_threads: int):
+        """Pin torch intra/inter-op thread pools for CPU inference"""
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(2)
+        except RuntimeError:
+            # Can only be set once per process, before any inter-op work
+            pass
+        print(f"   CPU threads: {torch.get_num_threads()}")
+    
+    def _load_onnx_encoder(self, cache_dir: str, num_threads: int):
+        """Build the ONNX encoder, or return the torch model if that is not possible"""
+        pooling = self.model[1] if len(self.model) > 1 else None
+        if not getattr(pooling, 'pooling_mode_mean_tokens', False):
+            print("[WARN] ONNX backend only supports mean-pooling models, using torch")
+            return self.model
+        
+        normalize = any(type(module).__name__ == 'Normalize' for module in self.model)
+        try:
+            return _OnnxEncoder(self.model_name, cache_dir, self.device,
+                                max_seq_length=self.model.max_seq_length, normalize=normalize,
+                                num_threads=num_threads)
+        except ImportError:
+            print("[WARN] optimum[onnxruntime] not installed, using torch backend")
+        except Exception as e:
+            print(f"[WARN] ONNX export failed ({e}), using torch backend")
+        return self.model
+    
+    def _compile_model(self) -> bool:
+        """Compile the transformer module in place and warm it up"""
+        if not hasattr(torch, 'compile'):
+            print("[WARN] torch.compile needs PyTorch 2.x, running eagerly")
+            return False
+        
+        transformer = self.model[0]
+        eager = transformer.auto_model
+        try:
+            # Batch size and sequence length vary with every call, so ask for
+            # shape-generic kernels instead of recompiling per shape
+            transformer.auto_model = torch.compile(eager, dynamic=True)
+            with torch.inference_mode():
+                # Compilation happens on the first call; do it before real work
+                self.model.encode(["warmup"] * 2, show_progress_bar=False)
+        except Exception as e:
+            transformer.auto_model = eager
+            print(f"[WARN] torch.compile failed ({e}), running eagerly")
+            return False
+        return True
+    
+    def _apply_precision(self, precision: str) -> str:
+        """Cast model weights to the requested precision and return the one in effect"""
+        if precision == 'auto':
+            precision = 'fp16' if self.device.startswith('cuda') else 'fp32'
+        
+        if precision == 'fp16':
+            if self.device == 'cpu':
+                # Half-precision matmuls on CPU are slower than fp32, not faster
+                print("[WARN] fp16 is not supported on CPU, using fp32")
+                return 'fp32'
+            self.model.half()
+        elif precision == 'bf16':
+            self.model.to(dtype=torch.bfloat16)
+        
+        return precision
+    
+    def _encode(self, texts: Union[str, List[str]], **kwargs) -> np.ndarray:
+        """Run the model without autograd and return float32 vectors"""
+        if isinstance(texts, str) or len(texts) <= ENCODE_WINDOW:
+            with torch.inference_mode():
+                embeddings = self._encoder.encode(texts, convert_to_numpy=True, **kwargs)
+            # Reduced-precision weights must not leak into stored or cached vectors
+            return embeddings.astype(np.float32, copy=False)
+        
+        # Fill one preallocated host array window by window
+        embeddings = None
+        for start in range(0, len(texts), ENCODE_WINDOW):
+            window = self._encode(texts[start:start + ENCODE_WINDOW], **kwargs)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), window.shape[1]), dtype=np.float32)
+            embeddings[start:start + len(window)] = window
+        return embeddings
     
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -33,18 +286,35 @@ class Embedder:
         Returns:
             Numpy array of embedding vector
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             # Return zero vector for empty text
-            dim = self.model.get_sentence_embedding_dimension()
-            return np.zeros(dim)
+            return self._zero.copy()
+        
+        # Repeated queries (web UI, CLI re-runs in one process) skip the model
+        key = normalize_query(text) if self.normalize_queries else text
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            self._query_cache.move_to_end(key)
+            return cached.copy()
+        
+        embedding = self._encode(text)
+        
+        if self.query_cache_size > 0:
+            self._query_cache[key] = embedding
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
         
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding
+        # The caches keep the original; callers get their own copy, as on a hit
+        return embedding.copy()
     
     def embed_batch(self, texts: List[str], batch_size: int = 32, show_progress: bool = True) -> np.ndarray:
         """
         Generate embeddings for multiple texts efficiently.
         
+        Duplicate texts are encoded once. With a cache configured, vectors
+        for texts seen before are read back from it and only the remaining
+        distinct texts go through the model.
+        
         Args:
             texts: List of text strings
             batch_size: Number of texts to process at once
@@ -56,25 +326,51 @@ class Embedder:
         if not texts:
             return np.array([])
         
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True
-        )
+        if self.cache is None:
+            # Signatures and quoted replies repeat; each distinct text is
+            # encoded once and its vector copied to every position
+            unique = list(dict.fromkeys(texts))
+            embeddings = self._encode(
+                unique,
+                batch_size=batch_size,
+                show_progress_bar=show_progress
+            )
+            if len(unique) == len(texts):
+                return embeddings
+            position = {text: i for i, text in enumerate(unique)}
+            return embeddings[[position[text] for text in texts]]
         
-        return embeddings
+        keys = [self.cache.key(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+        misses = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        
+        if misses:
+            embeddings = self._encode(
+                list(misses.values()),
+                batch_size=batch_size,
+                show_progress_bar=show_progress
+            )
+            fresh = dict(zip(misses, embeddings))
+            self.cache.put_many(fresh.items())
+            vectors.update(fresh)
+        
+        if len(misses) < len(texts):
+            print(f"    [CACHE] Reused {len(texts) - len(misses)}/{len(texts)} embeddings")
+        return np.stack([vectors[key] for key in keys])
     
-    def embed_messages(self, messages: List[dict], text_key: str = 'embedding_text') -> List[dict]:
+    def embed_messages(self, messages: List[dict], text_key: str = 'embedding_text',
+                       batch_size: int = 32) -> List[dict]:
         """
         Add embeddings to message dictionaries.
         
         Args:
             messages: List of message dictionaries
             text_key: Key in message dict containing text to embed
+            batch_size: Number of texts per model forward pass
             
         Returns:
-            List of messages with 'embedding' field added
+            List of messages with 'embedding' field added (a float32 row of
+            one shared array, not a Python list)
         """
         if not messages:
             return []
@@ -85,18 +381,25 @@ class Embedder:
         texts = [msg.get(text_key, '') for msg in messages]
         
         # Generate embeddings in batch
-        embeddings = self.embed_batch(texts, show_progress=True)
+        embeddings = self.embed_batch(texts, batch_size=batch_size, show_progress=True)
         
-        # Add embeddings to messages
+        # Rows are views into one array; converting them to lists would
+        # allocate a Python float per dimension for every message
         for msg, emb in zip(messages, embeddings):
-            msg['embedding'] = emb.tolist()  # Convert to list for JSON serialization
+            msg['embedding'] = emb
         
         print(f"[OK] Generated {len(embeddings)} embeddings")
         return messages
     
+    def close(self):
+        """Close the embedding cache, if one is open"""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+    
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings produced by this model"""
-        return self.model.get_sentence_embedding_dimension()
+        return self._dim
     
     def similarity(self, embedding1: Union[np.ndarray, List[float]], 
                    embedding2: Union[np.ndarray, List[float]]) -> float:
@@ -124,4 +427,35 @@ class Embedder:
         if norm1 == 0 or norm2 == 0:
             return 0.0
         
-        return dot_product / (norm1 * norm2)
\ No newline at end of file
+        return dot_product / (norm1 * norm2)
+    
+    def similarity_batch(self, query: Union[np.ndarray, List[float]],
+                         embeddings: Union[np.ndarray, List[List[float]]]) -> np.ndarray:
+        """
+        Calculate cosine similarity between one query and many embeddings.
+        
+        Normalizes the query once and scores every row with a single
+        matrix-vector product instead of calling similarity() in a Python
+        loop.
+        
+        Args:
+            query: Query embedding vector
+            embeddings: Candidate embeddings, shape (n, dim)
+            
+        Returns:
+            Array of n similarity scores between -1 and 1 (0 for zero vectors)
+        """
+        query = np.asarray(query, dtype=np.float32)
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0 or embeddings.size == 0:
+            return np.zeros(len(embeddings), dtype=np.float32)
+        
+        norms = np.linalg.norm(embeddings, axis=1)
+        # Zero rows get an infinite norm so they score 0
+        norms[norms == 0] = np.inf
+        
+        scores = embeddings @ (query / query_norm)
+        scores /= norms
+        return scores
@@ -6,6 +6,8 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 from datetime import datetime
 
+from src.utils.raw_data import dump_json_bytes
+
 
 class BaseConnector(ABC):
     """Abstract base class for all platform connectors (Gmail, Slack, etc.)"""
@@ -19,6 +21,9 @@ class BaseConnector(ABC):
         """
         self.config = config
         self.platform_name = self._get_platform_name()
+        # The full API payload roughly doubles each message in memory and in
+        # the raw dumps, and nothing downstream reads it; keep it only on request
+        self.keep_raw = config.get('keep_raw', False)
     
     @abstractmethod
     def _get_platform_name(self) -> str:
@@ -58,9 +63,10 @@ class BaseConnector(ABC):
             raw_message: Platform-specific message data
             
         Returns:
-            Normalized message in universal format
+            Normalized message in universal format (with the original payload
+            under 'raw_data' only when keep_raw is set in the config)
         """
-        return {
+        message = {
             "id": self._extract_id(raw_message),
             "platform": self.platform_name,
             "type": self._extract_type(raw_message),
@@ -72,8 +78,10 @@ class BaseConnector(ABC):
             "attachments": self._extract_attachments(raw_message),
             "thread_id": self._extract_thread_id(raw_message),
             "url": self._generate_url(raw_message),
-            "raw_data": raw_message  # Keep original for reference
         }
+        if self.keep_raw:
+            message["raw_data"] = raw_message  # Keep original for reference
+        return message
     
     @abstractmethod
     def _extract_id(self, raw_message: Dict[str, Any]) -> str:
@@ -134,21 +142,32 @@ class BaseConnector(ABC):
         """
         Save raw messages to JSON file.
         
+        Messages are serialized one at a time (with orjson when available),
+        one per line, into a large write buffer instead of pretty-printing
+        the whole document in one json.dump call. The file is still a single
+        valid JSON document.
+        
         Args:
             messages: List of messages
             output_path: Path to save JSON file
         """
-        import json
         from pathlib import Path
         
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                "platform": self.platform_name,
-                "fetch_date": datetime.now().isoformat(),
-                "message_count": len(messages),
-                "messages": messages
-            }, f, indent=2, ensure_ascii=False)
+        header = dump_json_bytes({
+            "platform": self.platform_name,
+            "fetch_date": datetime.now().isoformat(),
+            "message_count": len(messages),
+        })
+        
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            # Reopen the header object to append the messages array
+            f.write(header[:-1])
+            f.write(b', "messages": [')
+            for i, msg in enumerate(messages):
+                f.write(b'\n' if i == 0 else b',\n')
+                f.write(dump_json_bytes(msg))
+            f.write(b'\n]}\n')
         
         print(f"[OK] Saved {len(messages)} messages to {output_path}")
\ No newline at end of file
@@ -3,9 +3,10 @@ Gmail API connector for fetching emails.
 Path: src/ingest/gmail_connector.py
 """
 import os
-import base64
+import binascii
 from typing import List, Dict, Any
 from datetime import datetime
+from email.utils import getaddresses
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -13,6 +14,10 @@ from googleapiclient.discovery import build
 from google.auth.exceptions import RefreshError
 import pickle
 import io
+from itertools import islice
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pypdf import PdfReader
 import docx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
@@ -22,16 +27,142 @@ from .base_connector import BaseConnector
 
 logger = logging.getLogger(__name__)
 
+# Attachment types that need a real (CPU-heavy) parser
+PARSED_ATTACHMENT_EXTS = ('.pdf', '.docx', '.doc')
+
+
+# URL-safe base64 alphabet -> standard alphabet
+_B64_TRANS = bytes.maketrans(b'-_', b'+/')
+
+
+def _b64decode(data) -> bytes:
+    """Decode Gmail's URL-safe base64 (str or bytes) with one translate and the C decoder"""
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    return binascii.a2b_base64(data.translate(_B64_TRANS))
+
+
+def _part_fields(depth: int) -> str:
+    """Partial-response mask for a MIME part and `depth` levels of sub-parts"""
+    if depth == 0:
+        return "mimeType,filename,body,parts"
+    return f"mimeType,filename,body,parts({_part_fields(depth - 1)})"
+
+
+# Only the parts of a message that normalize_message reads. Drops labelIds,
+# historyId, sizeEstimate, partIds and the per-part MIME headers.
+MESSAGE_FIELDS = f"id,threadId,internalDate,snippet,payload(headers(name,value),{_part_fields(3)})"
+
+
+def _parse_pdf_bytes(content_bytes: bytes, max_pages: int = None) -> str:
+    """Extract text from PDF bytes (only the first max_pages pages, if set)"""
+    try:
+        reader = PdfReader(io.BytesIO(content_bytes))
+        pages = islice(reader.pages, max_pages or None)
+        return "\n".join(page.extract_text() or "" for page in pages).strip()
+    except Exception as e:
+        print(f"    [ERROR] PDF parsing failed: {e}")
+        return ""
+
+
+def _parse_docx_bytes(content_bytes: bytes) -> str:
+    """Extract text from DOCX bytes"""
+    try:
+        doc = docx.Document(io.BytesIO(content_bytes))
+        return "\n".join(para.text or "" for para in doc.paragraphs).strip()
+    except Exception as e:
+        print(f"    [ERROR] DOCX parsing failed: {e}")
+        return ""
+
+
+def extract_attachment_text(raw_content: bytes, filename: str, mime_type: str,
+                            max_pdf_pages: int = None) -> str:
+    """
+    Turn attachment bytes into text based on file extension or mime type.
+    
+    Top-level so it can run in a worker process.
+    
+    Args:
+        raw_content: Attachment bytes
+        filename: Attachment file name
+        mime_type: Attachment MIME type
+        max_pdf_pages: Only read this many pages of a PDF (None or 0 = all)
+    
+    Returns:
+        Extracted text, or "" for unsupported or empty attachments
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.pdf':
+        return _parse_pdf_bytes(raw_content, max_pdf_pages)
+    if ext in ('.docx', '.doc'):
+        return _parse_docx_bytes(raw_content)
+    if mime_type == 'text/plain' or ext in ('.txt', '.md', '.csv'):
+        return raw_content.decode('utf-8', errors='ignore')
+    return ""
+
+
+_PARSE_POOL = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all connectors for PDF/DOCX parsing (started on first use)"""
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        _PARSE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _PARSE_POOL
+
 
 class GmailConnector(BaseConnector):
     """Connector for Gmail API"""
     
     SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
     
+    # Gmail accepts at most 100 calls in one batch request
+    MAX_BATCH_SIZE = 100
+    
+    # Requests kept in flight when calls cannot be batched (retries, attachments)
+    DEFAULT_FETCH_CONCURRENCY = 16
+    
+    # Fetched batches waiting to be normalized while the next one downloads
+    PREFETCH_BATCHES = 2
+    
+    # Credentials and services of this process, keyed by token file
+    _CREDS_CACHE: Dict[str, Credentials] = {}
+    _SERVICE_CACHE: Dict[str, Any] = {}
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.service = None
         self.creds = None
+        # While fetch_messages runs, PDF/DOCX parses in flight are queued here
+        # as (attachments list, attachment dict, future) and collected at the end
+        self._deferred_attachments = None
+        self.fetch_concurrency = config.get('fetch_concurrency', self.DEFAULT_FETCH_CONCURRENCY)
+        self.max_pdf_pages = config.get('max_pdf_pages')
+        # googleapiclient's HTTP object is not thread-safe: one service per thread.
+        # The worker threads live as long as the connector, so each builds its
+        # service once.
+        self._local = threading.local()
+        self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Shut down the fetch thread pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for un-batched requests (started on first use)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.fetch_concurrency,
+                                                thread_name_prefix="gmail-fetch")
+        return self._executor
     
     def _get_platform_name(self) -> str:
         return "gmail"
@@ -40,13 +171,22 @@ class GmailConnector(BaseConnector):
         """
         Authenticate with Gmail API using OAuth2.
         Creates token.json on first run.
+        
+        Credentials and the service are cached per token file, so later
+        connectors in the same process skip the token load and client build.
         """
-        creds = None
         token_file = self.config.get('token_file', 'token.json')
         creds_file = self.config.get('credentials_file', 'credentials.json')
         
+        creds = self._CREDS_CACHE.get(token_file)
+        if creds is not None and creds.valid and token_file in self._SERVICE_CACHE:
+            self.creds = creds
+            self.service = self._SERVICE_CACHE[token_file]
+            print("[OK] Gmail authentication successful (cached credentials)")
+            return True
+        
         # Check if token.json exists
-        if os.path.exists(token_file):
+        if creds is None and os.path.exists(token_file):
             with open(token_file, 'rb') as token:
                 creds = pickle.load(token)
         
@@ -85,7 +225,10 @@ class GmailConnector(BaseConnector):
                 pickle.dump(creds, token)
         
         self.creds = creds
-        self.service = build('gmail', 'v1', credentials=creds)
+        # The discovery document bundled with the client avoids an HTTP round trip
+        self.service = build('gmail', 'v1', credentials=creds, static_discovery=True)
+        self._CREDS_CACHE[token_file] = creds
+        self._SERVICE_CACHE[token_file] = self.service
         print("[OK] Gmail authentication successful!")
         return True
     
@@ -95,9 +238,17 @@ class GmailConnector(BaseConnector):
         retry=retry_if_exception_type((RefreshError, ConnectionError, TimeoutError, Exception)),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
-    def fetch_messages(self, max_results: int = 100, since_date: str = None, since_id: str = None) -> List[Dict[str, Any]]:
+    def fetch_messages(self, max_results: int = 100, since_date: str = None, since_id: str = None,
+                       batch_size: int = MAX_BATCH_SIZE) -> List[Dict[str, Any]]:
         """
         Fetch emails from Gmail with optional incremental filtering.
+        
+        Full message bodies are requested in batches of batch_size (capped
+        at MAX_BATCH_SIZE) rather than one HTTP round trip per message.
+        A background thread keeps up to PREFETCH_BATCHES batches downloaded
+        ahead of the loop that normalizes them.
+        PDF/DOCX attachments are parsed in a shared process pool as soon as
+        they are downloaded and collected once all messages are normalized.
         """
         if not self.service:
             raise Exception("Not authenticated. Call authenticate() first.")
@@ -142,36 +293,62 @@ class GmailConnector(BaseConnector):
                     since_ts = datetime.fromisoformat(since_date.split('.')[0].replace('Z', '+00:00')).timestamp() * 1000
                 except: pass
 
-            for i, msg in enumerate(messages, 1):
-                try:
-                    # Skip if it's the since_id
-                    if since_id and f"gmail_{msg['id']}" == since_id:
-                        print(f"  [INFO] Reached last processed message ID: {since_id}. Stopping.")
-                        break
-
-                    full_msg = self.service.users().messages().get(
-                        userId='me',
-                        id=msg['id'],
-                        format='full'
-                    ).execute()
-                    
-                    # Check internalDate for precision
-                    msg_ts = int(full_msg['internalDate'])
-                    if since_ts and msg_ts <= since_ts:
-                        # Message is older or equal to our last checkpoint
-                        # Note: We continue to be safe, but typically Gmail list is reverse chrono
-                        # so we could probably break here.
-                        continue
+            # Only fetch messages newer than the last processed ID
+            for i, msg in enumerate(messages):
+                if since_id and f"gmail_{msg['id']}" == since_id:
+                    print(f"  [INFO] Reached last processed message ID: {since_id}. Stopping.")
+                    messages = messages[:i]
+                    break
+            
+            # Download the next batches while the current one is normalized
+            batches = queue.Queue(maxsize=self.PREFETCH_BATCHES)
+            errors = []
+            producer = threading.Thread(
+                target=self._prefetch_batches,
+                args=([msg['id'] for msg in messages], batch_size, batches, errors),
+                daemon=True
+            )
+            producer.start()
+            
+            self._deferred_attachments = []
+            i = 0
+            while True:
+                item = batches.get()
+                if item is None:
+                    break
+                
+                chunk, fetched = item
+                for msg_id in chunk:
+                    i += 1
+                    try:
+                        full_msg = fetched.get(msg_id)
+                        if full_msg is None:
+                            continue
+                        
+                        # Check internalDate for precision
+                        msg_ts = int(full_msg['internalDate'])
+                        if since_ts and msg_ts <= since_ts:
+                            # Message is older or equal to our last checkpoint
+                            # Note: We continue to be safe, but typically Gmail list is reverse chrono
+                            # so we could probably break here.
+                            continue
 
-                    normalized = self.normalize_message(full_msg)
-                    detailed_messages.append(normalized)
-                    
-                    if i % 10 == 0:
-                        print(f"  Processed {i}/{len(messages)} messages...")
+                        normalized = self.normalize_message(full_msg)
+                        detailed_messages.append(normalized)
                         
-                except Exception as e:
-                    print(f"  [WARN] Error fetching message {msg['id']}: {e}")
-                    continue
+                        if i % 10 == 0:
+                            print(f"  Processed {i}/{len(messages)} messages...")
+                            
+                    except Exception as e:
+                        print(f"  [WARN] Error processing message {msg_id}: {e}")
+                        continue
+            
+            producer.join()
+            if errors:
+                raise errors[0]
+            
+            pending, self._deferred_attachments = self._deferred_attachments, None
+            self._collect_parsed_attachments(pending)
             
             # Sort by date ascending (oldest first) so that the last one processed is the newest
             # This makes updating state easier if we process in batches
@@ -181,55 +358,186 @@ class GmailConnector(BaseConnector):
             return detailed_messages
             
         except Exception as e:
+            self._deferred_attachments = None
             print(f"[ERROR] Error fetching messages: {e}")
             return []
     
+    def _collect_parsed_attachments(self, pending: List[tuple]):
+        """
+        Wait for submitted PDF/DOCX parses and fill in their content;
+        attachments without text are dropped from their message.
+        """
+        if not pending:
+            return
+        
+        print(f"[INFO] Collecting {len(pending)} parsed attachments...")
+        for attachments, att, future in pending:
+            try:
+                content = future.result()
+            except Exception as e:
+                print(f"  [ERROR] Failed to parse attachment {att['filename']}: {e}")
+                content = ""
+            
+            if content:
+                att['content'] = content
+                print(f"  [OK] Extracted {len(content)} chars from {att['filename']}")
+            else:
+                attachments.remove(att)
+                print(f"  [WARN] Could not extract text from {att['filename']} (unsupported format or empty)")
+    
+    def _get_messages_batch(self, message_ids: List[str], batch_size: int = MAX_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch full messages using Gmail batch requests.
+        
+        Args:
+            message_ids: Gmail message IDs
+            batch_size: Messages per batch request (capped at MAX_BATCH_SIZE)
+            
+        Returns:
+            Dictionary mapping message ID to the full message (failed IDs are left out)
+        """
+        full_messages = {}
+        for _, fetched in self._iter_message_batches(message_ids, batch_size):
+            full_messages.update(fetched)
+        return full_messages
+    
+    def _iter_message_batches(self, message_ids: List[str], batch_size: int = MAX_BATCH_SIZE):
+        """
+        Fetch full messages one Gmail batch request at a time.
+        
+        Calls that fail inside a batch, or a batch that fails as a whole,
+        are retried individually, up to fetch_concurrency at a time.
+        
+        Args:
+            message_ids: Gmail message IDs
+            batch_size: Messages per batch request (capped at MAX_BATCH_SIZE)
+            
+        Yields:
+            (chunk of message IDs, dictionary mapping ID to full message)
+        """
+        service = self._thread_service()
+        batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+        
+        for start in range(0, len(message_ids), batch_size):
+            chunk = message_ids[start:start + batch_size]
+            fetched = {}
+            failed = []
+            
+            def on_response(request_id, response, exception):
+                if exception is not None:
+                    failed.append(request_id)
+                else:
+                    fetched[request_id] = response
+            
+            batch = service.new_batch_http_request(callback=on_response)
+            for msg_id in chunk:
+                batch.add(
+                    service.users().messages().get(userId='me', id=msg_id, format='full',
+                                                   fields=MESSAGE_FIELDS),
+                    request_id=msg_id
+                )
+            
+            try:
+                batch.execute()
+            except Exception as e:
+                print(f"  [WARN] Batch request failed ({e}), fetching {len(chunk)} messages individually")
+                failed.extend(msg_id for msg_id in chunk if msg_id not in fetched)
+            
+            if failed:
+                executor = self._get_executor()
+                futures = {executor.submit(self._fetch_message, msg_id): msg_id for msg_id in failed}
+                for future in as_completed(futures):
+                    msg_id = futures[future]
+                    try:
+                        fetched[msg_id] = future.result()
+                    except Exception as e:
+                        print(f"  [WARN] Error fetching message {msg_id}: {e}")
+            
+            print(f"  Fetched {min(start + batch_size, len(message_ids))}/{len(message_ids)} messages...")
+            yield chunk, fetched
+    
+    def _prefetch_batches(self, message_ids: List[str], batch_size: int,
+                          batches: queue.Queue, errors: List[Exception]):
+        """
+        Producer for fetch_messages: put each fetched batch on the queue,
+        then a None sentinel. An unexpected error is handed back in errors.
+        """
+        try:
+            for item in self._iter_message_batches(message_ids, batch_size):
+                batches.put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            batches.put(None)
+    
+    def _thread_service(self):
+        """Gmail service for the calling thread (worker threads build their own)"""
+        if self.creds is None or threading.current_thread() is threading.main_thread():
+            return self.service
+        
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('gmail', 'v1', credentials=self.creds, static_discovery=True)
+            self._local.service = service
+        return service
+    
+    def _fetch_message(self, msg_id: str) -> Dict[str, Any]:
+        """Fetch one full message (safe to call from worker threads)"""
+        return self._thread_service().users().messages().get(
+            userId='me',
+            id=msg_id,
+            format='full',
+            fields=MESSAGE_FIELDS
+        ).execute()
+    
     def _extract_id(self, raw_message: Dict[str, Any]) -> str:
         return f"gmail_{raw_message['id']}"
     
     def _extract_type(self, raw_message: Dict[str, Any]) -> str:
         return "email"
     
+    def normalize_message(self, raw_message: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a Gmail message, dropping the header index afterwards"""
+        try:
+            return super().normalize_message(raw_message)
+        finally:
+            # Keep the API payload (and raw dumps with keep_raw) free of '_hdrs'
+            raw_message.pop('_hdrs', None)
+    
+    def _get_headers(self, raw_message: Dict[str, Any]) -> Dict[str, str]:
+        """Lower-cased header name -> value, built once per message while it is normalized"""
+        headers = raw_message.get('_hdrs')
+        if headers is None:
+            # Reversed so the first occurrence of a repeated header wins
+            headers = {h['name'].lower(): h['value'] for h in reversed(raw_message['payload']['headers'])}
+            raw_message['_hdrs'] = headers
+        return headers
+    
     def _extract_sender(self, raw_message: Dict[str, Any]) -> Dict[str, str]:
-        headers = raw_message['payload']['headers']
-        from_header = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
-        
-        # Parse "Name <email@example.com>" format
-        if '<' in from_header:
-            name = from_header.split('<')[0].strip().strip('"')
-            email = from_header.split('<')[1].strip('>')
-        else:
-            name = from_header
-            email = from_header
+        from_header = self._get_headers(raw_message).get('from', '')
         
-        return {"name": name, "email": email}
+        # Parse "Name <email@example.com>" format (bare addresses use the email as name)
+        name, email = getaddresses([from_header])[0] if from_header else ('', '')
+        return {"name": name or email, "email": email}
     
     def _extract_recipients(self, raw_message: Dict[str, Any]) -> List[Dict[str, str]]:
-        headers = raw_message['payload']['headers']
-        to_header = next((h['value'] for h in headers if h['name'].lower() == 'to'), '')
-        
-        recipients = []
-        if to_header:
-            # Split by comma for multiple recipients
-            for recipient in to_header.split(','):
-                recipient = recipient.strip()
-                if '<' in recipient:
-                    name = recipient.split('<')[0].strip().strip('"')
-                    email = recipient.split('<')[1].strip('>')
-                else:
-                    name = recipient
-                    email = recipient
-                recipients.append({"name": name, "email": email})
+        to_header = self._get_headers(raw_message).get('to', '')
+        if not to_header:
+            return []
         
-        return recipients
+        # getaddresses handles quoted commas ("Last, First" <x@y.com>)
+        return [
+            {"name": name or email, "email": email}
+            for name, email in getaddresses([to_header])
+            if name or email
+        ]
     
     def _extract_date(self, raw_message: Dict[str, Any]) -> str:
         timestamp = int(raw_message['internalDate']) / 1000
         return datetime.fromtimestamp(timestamp).isoformat()
     
     def _extract_subject(self, raw_message: Dict[str, Any]) -> str:
-        headers = raw_message['payload']['headers']
-        return next((h['value'] for h in headers if h['name'].lower() == 'subject'), '(No Subject)')
+        return self._get_headers(raw_message).get('subject', '(No Subject)')
     
     @retry(
         stop=stop_after_attempt(3),
@@ -241,93 +549,120 @@ class GmailConnector(BaseConnector):
         """Extract and parse attachments from Gmail message"""
         msg_id = raw_message['id']
         payload = raw_message.get('payload', {})
+        parts = []
         attachments = []
+        # Outside fetch_messages, parses are collected before returning
+        pending = self._deferred_attachments if self._deferred_attachments is not None else []
         
-        self._find_attachments(payload, msg_id, attachments)
-        return attachments
-
-    def _find_attachments(self, part: Dict[str, Any], msg_id: str, attachments: List[Dict[str, Any]]):
-        """Recursively find attachments in message parts"""
-        filename = part.get('filename')
-        body = part.get('body', {})
-        attachment_id = body.get('attachmentId')
+        self._find_attachments(payload, msg_id, parts)
+        if not parts:
+            return attachments
         
-        if filename and attachment_id:
-            size = body.get('size', 0)
-            mime_type = part.get('mimeType', '')
-            
-            # 1. Skip very large attachments (> 25MB) to avoid OOM or timeouts
-            if size > 25 * 1024 * 1024:
-                print(f"  [WARN] Skipping {filename} - too large ({size / 1024 / 1024:.1f} MB)")
-                return
-
-            # 2. Skip unsupported compressed or binary formats
-            unsupported_exts = ['.rar', '.zip', '.7z', '.exe', '.dll', '.bin', '.iso', '.dmg']
-            if any(filename.lower().endswith(ext) for ext in unsupported_exts):
-                print(f"  [INFO] Skipping {filename} - unsupported format")
-                return
-
-            print(f"  [INFO] Processing attachment: {filename} ({mime_type}, {size} bytes)")
+        # Download all attachments of the message concurrently, then
+        # process them in message order (inline ones need no request)
+        remote = sum(1 for part in parts if not part['body'].get('data'))
+        if remote <= 1:
+            downloads = [self._fetch_attachment(msg_id, part) for part in parts]
+        else:
+            downloads = list(self._get_executor().map(lambda part: self._fetch_attachment(msg_id, part), parts))
+        
+        for part, raw_content in zip(parts, downloads):
+            if raw_content is None:
+                continue
             
-            # Fetch attachment data
+            filename = part['filename']
+            mime_type = part.get('mimeType', '')
             try:
-                attachment_data = self.service.users().messages().attachments().get(
-                    userId='me',
-                    messageId=msg_id,
-                    id=attachment_id
-                ).execute()
-                
-                raw_content = base64.urlsafe_b64decode(attachment_data['data'])
-                
-                # Parse content based on file extension or mime type
-                content = ""
-                ext = Path(filename).suffix.lower()
-                
-                if ext == '.pdf':
-                    content = self._parse_pdf(raw_content)
-                elif ext in ['.docx', '.doc']:
-                    content = self._parse_docx(raw_content)
-                elif mime_type == 'text/plain' or ext in ['.txt', '.md', '.csv']:
-                    content = raw_content.decode('utf-8', errors='ignore')
-                
-                if content:
-                    attachments.append({
-                        "filename": filename,
-                        "mime_type": mime_type,
-                        "content": content
-                    })
-                    print(f"  [OK] Extracted {len(content)} chars from {filename}")
+                # Heavy parsing runs in the process pool while fetching goes on
+                if filename.lower().endswith(PARSED_ATTACHMENT_EXTS):
+                    attachment = {"filename": filename, "mime_type": mime_type, "content": ""}
+                    attachments.append(attachment)
+                    future = _get_parse_pool().submit(
+                        extract_attachment_text, raw_content, filename, mime_type, self.max_pdf_pages
+                    )
+                    pending.append((attachments, attachment, future))
                 else:
-                    print(f"  [WARN] Could not extract text from {filename} (unsupported format or empty)")
+                    content = extract_attachment_text(raw_content, filename, mime_type)
+                    
+                    if content:
+                        attachments.append({
+                            "filename": filename,
+                            "mime_type": mime_type,
+                            "content": content
+                        })
+                        print(f"  [OK] Extracted {len(content)} chars from {filename}")
+                    else:
+                        print(f"  [WARN] Could not extract text from {filename} (unsupported format or empty)")
                     
             except Exception as e:
-                print(f"  [ERROR] Failed to fetch/parse attachment {filename}: {e}")
+                print(f"  [ERROR] Failed to parse attachment {filename}: {e}")
+        
+        if pending is not self._deferred_attachments:
+            self._collect_parsed_attachments(pending)
+        return attachments
 
-        # Recurse through sub-parts
-        if 'parts' in part:
-            for subpart in part['parts']:
-                self._find_attachments(subpart, msg_id, attachments)
+    def _find_attachments(self, part: Dict[str, Any], msg_id: str, parts: List[Dict[str, Any]]):
+        """Collect the message parts whose attachments should be downloaded (depth-first, in order)"""
+        stack = [part]
+        while stack:
+            part = stack.pop()
+            filename = part.get('filename')
+            body = part.get('body', {})
+            attachment_id = body.get('attachmentId')
+            
+            if filename and (attachment_id or body.get('data')):
+                size = body.get('size', 0)
+                mime_type = part.get('mimeType', '')
+                
+                # 1. Skip very large attachments (> 25MB) to avoid OOM or timeouts
+                if size > 25 * 1024 * 1024:
+                    print(f"  [WARN] Skipping {filename} - too large ({size / 1024 / 1024:.1f} MB)")
+                    continue
 
-    def _parse_pdf(self, content_bytes: bytes) -> str:
-        """Extract text from PDF bytes"""
+                # 2. Skip unsupported compressed or binary formats
+                unsupported_exts = ['.rar', '.zip', '.7z', '.exe', '.dll', '.bin', '.iso', '.dmg']
+                if any(filename.lower().endswith(ext) for ext in unsupported_exts):
+                    print(f"  [INFO] Skipping {filename} - unsupported format")
+                    continue
+
+                print(f"  [INFO] Processing attachment: {filename} ({mime_type}, {size} bytes)")
+                parts.append(part)
+
+            # Visit sub-parts next, first one on top
+            stack.extend(reversed(part.get('parts', ())))
+
+    def _fetch_attachment(self, msg_id: str, part: Dict[str, Any]):
+        """
+        Download and decode one attachment (safe to call from worker threads).
+        
+        Small attachments come inline in the message payload and are
+        decoded without calling the attachments endpoint.
+        
+        Returns:
+            Attachment bytes, or None if the download failed
+        """
         try:
-            reader = PdfReader(io.BytesIO(content_bytes))
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            inline_data = part['body'].get('data')
+            if inline_data:
+                return _b64decode(inline_data)
+            
+            attachment_data = self._thread_service().users().messages().attachments().get(
+                userId='me',
+                messageId=msg_id,
+                id=part['body']['attachmentId']
+            ).execute()
+            return _b64decode(attachment_data['data'])
         except Exception as e:
-            print(f"    [ERROR] PDF parsing failed: {e}")
-            return ""
+            print(f"  [ERROR] Failed to fetch attachment {part['filename']}: {e}")
+            return None
+
+    def _parse_pdf(self, content_bytes: bytes) -> str:
+        """Extract text from PDF bytes"""
+        return _parse_pdf_bytes(content_bytes)
 
     def _parse_docx(self, content_bytes: bytes) -> str:
         """Extract text from DOCX bytes"""
-        try:
-            doc = docx.Document(io.BytesIO(content_bytes))
-            return "\n".join([para.text for para in doc.paragraphs]).strip()
-        except Exception as e:
-            print(f"    [ERROR] DOCX parsing failed: {e}")
-            return ""
+        return _parse_docx_bytes(content_bytes)
     
     def _extract_content(self, raw_message: Dict[str, Any]) -> str:
         """Extract email body (plain text preferred, HTML as fallback)"""
@@ -343,23 +678,26 @@ class GmailConnector(BaseConnector):
         return body
     
     def _get_body_from_parts(self, payload: Dict[str, Any]) -> str:
-        """Recursively extract body from email parts"""
-        if 'body' in payload and payload['body'].get('data'):
-            return base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                # Prefer plain text
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        return base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                
-                # Recursive search
-                body = self._get_body_from_parts(part)
-                if body:
-                    return body
+        """
+        Find the body in the MIME tree: the first text/plain part, otherwise
+        the first other non-attachment part with data (usually HTML).
+        """
+        fallback = None
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            data = part.get('body', {}).get('data')
+            if data and not part.get('filename'):
+                if part.get('mimeType') == 'text/plain':
+                    return _b64decode(data).decode('utf-8', errors='ignore')
+                if fallback is None:
+                    fallback = data
+            
+            stack.extend(reversed(part.get('parts', ())))
         
-        return ""
+        if fallback is None:
+            return ""
+        return _b64decode(fallback).decode('utf-8', errors='ignore')
     
     def _extract_thread_id(self, raw_message: Dict[str, Any]) -> str:
         return raw_message.get('threadId', '')
@@ -44,12 +44,13 @@ class MCPGmailConnector(MCPConnectorBase):
         # The existing connector is synchronous, so we just call it directly
         return self.gmail_connector.authenticate()
     
-    async def fetch_messages(self, max_results: int = 100, since_date: str = None, since_id: str = None) -> List[Dict[str, Any]]:
+    async def fetch_messages(self, max_results: int = 100, since_date: str = None, since_id: str = None,
+                             batch_size: int = GmailConnector.MAX_BATCH_SIZE) -> List[Dict[str, Any]]:
         """
         Fetch messages from Gmail.
         """
         # The existing connector is synchronous, so we just call it directly
-        return self.gmail_connector.fetch_messages(max_results, since_date, since_id)
+        return self.gmail_connector.fetch_messages(max_results, since_date, since_id, batch_size=batch_size)
     
     async def search_messages(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """
@@ -77,15 +78,14 @@ class MCPGmailConnector(MCPConnectorBase):
             
             messages = results.get('messages', [])
             
-            # Fetch full message details
+            # Fetch full message details in batch requests
+            full_messages = self.gmail_connector._get_messages_batch([msg['id'] for msg in messages])
             detailed_messages = []
             for msg in messages:
                 try:
-                    full_msg = self.gmail_connector.service.users().messages().get(
-                        userId='me',
-                        id=msg['id'],
-                        format='full'
-                    ).execute()
+                    full_msg = full_messages.get(msg['id'])
+                    if full_msg is None:
+                        continue
                     
                     normalized = self.gmail_connector.normalize_message(full_msg)
                     detailed_messages.append(normalized)
@@ -106,13 +106,18 @@ class MCPGmailConnector(MCPConnectorBase):
         """Synchronous authentication (backward compatible)"""
         return self.gmail_connector.authenticate()
     
-    def fetch_messages_sync(self, max_results: int = 100, since_date: str = None, since_id: str = None) -> List[Dict[str, Any]]:
+    def fetch_messages_sync(self, max_results: int = 100, since_date: str = None, since_id: str = None,
+                            batch_size: int = GmailConnector.MAX_BATCH_SIZE) -> List[Dict[str, Any]]:
         """Synchronous message fetching (backward compatible)"""
-        return self.gmail_connector.fetch_messages(max_results, since_date, since_id)
+        return self.gmail_connector.fetch_messages(max_results, since_date, since_id, batch_size=batch_size)
     
     def save_raw_data(self, messages: List[Dict[str, Any]], output_path: str):
         """Save raw messages to JSON file (backward compatible)"""
         self.gmail_connector.save_raw_data(messages, output_path)
+    
+    def close(self):
+        """Release the Gmail connector's fetch threads"""
+        self.gmail_connector.close()
 
 
 # Convenience function for creating MCP Gmail connector
@@ -9,16 +9,20 @@ from src.preprocessing.semantic_cleaner import SemanticCleaner
 class TextChunker:
     """Split long texts into overlapping chunks for better retrieval"""
     
-    def __init__(self, chunk_size: int = 2000, overlap: int = 200):
+    def __init__(self, chunk_size: int = 2000, overlap: int = 200, min_chars: int = 1):
         """
         Initialize chunker.
         
         Args:
             chunk_size: Maximum characters per chunk
             overlap: Number of characters to overlap between chunks
+            min_chars: Chunks shorter than this (after stripping) are dropped;
+                they carry no retrievable content but still cost an embedding
         """
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.min_chars = min_chars
+        self.dropped = 0  # Chunks skipped by min_chars in the last chunk_messages call
     
     def chunk_text(self, text: str) -> List[str]:
         """
@@ -30,21 +34,13 @@ class TextChunker:
         Returns:
             List of text chunks
         """
-        print(f"      [DEBUG] chunk_text: Starting with {len(text)} chars", flush=True)
         if not text or len(text) <= self.chunk_size:
-            result = [text] if text else []
-            print(f"      [DEBUG] chunk_text: Text fits in one chunk, returning {len(result)} chunks", flush=True)
-            return result
+            return [text] if text else []
         
         chunks = []
         start = 0
-        iteration = 0
         
         while start < len(text):
-            iteration += 1
-            if iteration % 10 == 0:
-                print(f"      [DEBUG] chunk_text: Iteration {iteration}, start={start}, len={len(text)}", flush=True)
-            
             # Calculate end position
             end = start + self.chunk_size
             
@@ -86,9 +82,14 @@ class TextChunker:
                 new_start = start + 1
             start = new_start
         
-        print(f"      [DEBUG] chunk_text: Done, created {len(chunks)} chunks in {iteration} iterations", flush=True)
         return chunks
     
+    def _keep_substantial(self, chunks: List[str]) -> List[str]:
+        """Drop chunks under min_chars (chunk_text output is already stripped)"""
+        kept = [c for c in chunks if len(c) >= self.min_chars]
+        self.dropped += len(chunks) - len(kept)
+        return kept
+    
     def chunk_message(self, message: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Chunk a message and its attachments, creating separate linked records.
@@ -100,22 +101,17 @@ class TextChunker:
             List of chunked dictionaries (main body chunks + attachment chunks)
         """
         original_id = message['id']
-        print(f"    [DEBUG] chunk_message: Starting for ID {original_id[:30]}...", flush=True)
         all_chunks = []
         
         # 1. Prepare Base Metadata (Avoid copying all attachments multiple times)
         base_meta = {k: v for k, v in message.items() if k not in ['attachments', 'content', 'embedding_text']}
-        print(f"    [DEBUG] chunk_message: Prepared base metadata", flush=True)
         
         # 2. Chunk the main body
         subject = message.get('subject', '')
         content = message.get('content', '')
         full_text = f"{subject}\n\n{content}" if subject else content
-        print(f"    [DEBUG] chunk_message: Main body text length: {len(full_text)} chars", flush=True)
         
-        print(f"    [DEBUG] chunk_message: Calling chunk_text for main body...", flush=True)
-        text_chunks = self.chunk_text(full_text)
-        print(f"    [DEBUG] chunk_message: Got {len(text_chunks)} chunks from main body", flush=True)
+        text_chunks = self._keep_substantial(self.chunk_text(full_text))
         for idx, chunk in enumerate(text_chunks):
             chunked_msg = base_meta.copy()
             chunked_msg['id'] = f"{original_id}_chunk_{idx}"
@@ -137,16 +133,12 @@ class TextChunker:
             
             if not att_content:
                 continue
-            
-            print(f"    [DEBUG] Processing attachment {att_idx+1}/{len(attachments)}: {att_name} ({len(att_content)} chars)", flush=True)
                 
             # --- SEMANTIC CLEANING ---
             cleaned_content = SemanticCleaner.clean(att_content)
-            print(f"    [DEBUG] After cleaning: {len(cleaned_content)} chars", flush=True)
             # -------------------------
             
-            att_text_chunks = self.chunk_text(cleaned_content)
-            print(f"    [DEBUG] Created {len(att_text_chunks)} chunks from {att_name}", flush=True)
+            att_text_chunks = self._keep_substantial(self.chunk_text(cleaned_content))
             for chunk_idx, chunk in enumerate(att_text_chunks):
                 chunked_att = base_meta.copy()
                 chunked_att['id'] = f"{original_id}_att_{att_idx}_chunk_{chunk_idx}"
@@ -176,9 +168,11 @@ class TextChunker:
             List of chunked message dictionaries
         """
         chunked = []
-        for idx, msg in enumerate(messages):
-            print(f"  [DEBUG] Chunking message {idx+1}/{len(messages)} (ID: {msg.get('id', 'unknown')[:30]}...)", end='\r', flush=True)
+        self.dropped = 0
+        for msg in messages:
             chunked.extend(self.chunk_message(msg))
         
-        print(f"\n[INFO] Chunked {len(messages)} messages into {len(chunked)} chunks", flush=True)
+        print(f"[INFO] Chunked {len(messages)} messages into {len(chunked)} chunks", flush=True)
+        if self.dropped:
+            print(f"[INFO] Skipped {self.dropped} chunks shorter than {self.min_chars} chars")
         return chunked
@@ -5,6 +5,8 @@ Path: src/preprocessing/semantic_cleaner.py
 import re
 from typing import List, Set
 
+PAGE_NUMBER_PATTERN = re.compile(r'^(Page\s+\d+\s+of\s+\d+|\d+)$', re.IGNORECASE)
+
 class SemanticCleaner:
     """Heuristic-based cleaner to remove noise and extract key content from large attachments."""
     
@@ -68,7 +70,7 @@ class SemanticCleaner:
         for line in lines:
             line = line.strip()
             # Skip page numbering patterns like "Page 1 of 10" or just "12"
-            if re.match(r'^(Page\s+\d+\s+of\s+\d+|\d+)$', line, re.IGNORECASE):
+            if PAGE_NUMBER_PATTERN.match(line):
                 continue
             # Skip very short lines that likely contain no info (except headers)
             if len(line) < 2 and not line.isalnum():
@@ -1,14 +1,42 @@
 import os
-import yaml
 import requests
-from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+from src.utils.config_loader import CONFIG_PATH, load_config
+
 # Load environment variables
 load_dotenv()
 
 
+# Fixed instructions live in one template so every answer prompt shares an
+# identical prefix/suffix (cache-friendly for providers with prefix caching).
+ANSWER_PROMPT = """You are a personal memory assistant helping answer questions about past communications and events.
+
+**Question:** {query}
+
+**Retrieved Information:**
+{contexts}
+
+**Instructions:**
+1. Answer the question directly based ONLY on the provided sources.
+2. If the sources contain the answer, provide a clear, concise response.
+3. Cite which source(s) you used (e.g., "According to Source 1...").
+4. If multiple sources have relevant info, synthesize them naturally.
+5. If the sources don't contain enough information, say so clearly.
+6. Do not make up information or speculate beyond what's in the sources.
+
+**Answer:**"""
+
+SOURCE_TEMPLATE = """[Source {idx}]
+From: {sender_name} ({sender_email})
+Date: {date}
+Subject: {subject}
+Platform: {platform}
+Content: {content}
+"""
+
+
 class RAGBrain:
     """Generate answers using LLM and retrieved contexts"""
     
@@ -42,10 +70,8 @@ class RAGBrain:
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from config.yaml"""
         try:
-            config_path = Path(__file__).resolve().parent.parent.parent / "config.yaml"
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    return yaml.safe_load(f)
+            if CONFIG_PATH.exists():
+                return load_config(CONFIG_PATH)
         except Exception as e:
             print(f"[WARN] Failed to load config.yaml: {e}")
         return {}
@@ -172,37 +198,17 @@ class RAGBrain:
         context_texts = []
         for idx, ctx in enumerate(contexts[:5], 1):  # Limit to top 5
             metadata = ctx.get('metadata', {})
-            doc_text = ctx.get('full_text', ctx.get('snippet', ''))
-            
-            # Build context with metadata
-            context = f"[Source {idx}]\n"
-            context += f"From: {metadata.get('sender_name', 'Unknown')} ({metadata.get('sender_email', '')})\n"
-            context += f"Date: {metadata.get('date', 'Unknown')}\n"
-            context += f"Subject: {metadata.get('subject', 'No subject')}\n"
-            context += f"Platform: {metadata.get('platform', 'Unknown')}\n"
-            context += f"Content: {doc_text}\n"
-            
-            context_texts.append(context)
-        
-        contexts_str = "\n---\n".join(context_texts)
+            context_texts.append(SOURCE_TEMPLATE.format(
+                idx=idx,
+                sender_name=metadata.get('sender_name', 'Unknown'),
+                sender_email=metadata.get('sender_email', ''),
+                date=metadata.get('date', 'Unknown'),
+                subject=metadata.get('subject', 'No subject'),
+                platform=metadata.get('platform', 'Unknown'),
+                content=ctx.get('full_text', ctx.get('snippet', ''))
+            ))
         
-        # Build final prompt
-        prompt = f"""You are a personal memory assistant helping answer questions about past communications and events.
-
-**Question:** {query}
-
-**Retrieved Information:**
-{contexts_str}
-
-**Instructions:**
-1. Answer the question directly based ONLY on the provided sources.
-2. If the sources contain the answer, provide a clear, concise response.
-3. Cite which source(s) you used (e.g., "According to Source 1...").
-4. If multiple sources have relevant info, synthesize them naturally.
-5. If the sources don't contain enough information, say so clearly.
-6. Do not make up information or speculate beyond what's in the sources.
-
-**Answer:**"""
+        prompt = ANSWER_PROMPT.format(query=query, contexts="\n---\n".join(context_texts))
         
         return prompt
     
@@ -134,7 +134,8 @@ class SearchEngine:
         
         return enhanced
     
-    def format_results_for_display(self, results: List[Dict[str, Any]]) -> str:
+    @staticmethod
+    def format_results_for_display(results: List[Dict[str, Any]]) -> str:
         """
         Format search results for terminal display.
         
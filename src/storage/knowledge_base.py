@@ -2,7 +2,7 @@ import sqlite3
 import json
 import uuid
 import os
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from pathlib import Path
 
 class KnowledgeBase:
@@ -17,9 +17,22 @@ class KnowledgeBase:
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection tuned for this workload: WAL lets readers run during
+        writes and, with synchronous=NORMAL, commits skip a full fsync each.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
     def _init_db(self):
         """Initialize SQLite schema if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # Persistent setting, stored in the database file
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             
             # Entities Table (People, Organizations, Groups)
@@ -63,7 +76,7 @@ class KnowledgeBase:
         entity_id = str(uuid.uuid4())
         meta_json = json.dumps(metadata or {})
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute(
                 "INSERT INTO entities (id, type, canonical_name, metadata) VALUES (?, ?, ?, ?)",
                 (entity_id, entity_type, name, meta_json)
@@ -71,9 +84,33 @@ class KnowledgeBase:
             conn.commit()
         return entity_id
 
+    def add_entities_bulk(self, rows: List[Tuple[str, str, Optional[Dict]]]) -> List[str]:
+        """
+        Add many entities in one transaction.
+        
+        Args:
+            rows: (name, entity_type, metadata) tuples
+            
+        Returns:
+            New entity IDs, in the order of rows
+        """
+        entity_ids = [str(uuid.uuid4()) for _ in rows]
+        if not rows:
+            return entity_ids
+        
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO entities (id, type, canonical_name, metadata) VALUES (?, ?, ?, ?)",
+                [(eid, entity_type, name, json.dumps(metadata or {}))
+                 for eid, (name, entity_type, metadata) in zip(entity_ids, rows)]
+            )
+            conn.commit()
+        return entity_ids
+
     def add_alias(self, entity_id: str, value: str, alias_type: str = 'email'):
         """Bind an identifier to an entity."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             try:
                 conn.execute(
                     "INSERT INTO aliases (entity_id, alias_type, value) VALUES (?, ?, ?)",
@@ -89,7 +126,7 @@ class KnowledgeBase:
 
     def resolve_identity(self, identifier: str) -> Optional[Dict[str, Any]]:
         """Resolve an identifier (email, handle) to its canonical entity."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute('''
                 SELECT e.id, e.type, e.canonical_name, e.metadata
@@ -117,9 +154,55 @@ class KnowledgeBase:
                 return result
         return None
 
+    def resolve_identities_bulk(self, identifiers: List[str], chunk_size: int = 500) -> Dict[str, str]:
+        """
+        Resolve many identifiers at once.
+        
+        Returns:
+            Mapping of identifier -> entity ID for the ones already registered
+        """
+        resolved = {}
+        unique = list(dict.fromkeys(identifiers))
+        with self._connect() as conn:
+            for i in range(0, len(unique), chunk_size):
+                chunk = unique[i:i + chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT value, entity_id FROM aliases WHERE value IN ({placeholders})", chunk
+                )
+                resolved.update(cursor.fetchall())
+        return resolved
+
+    def add_identities_bulk(self, identities: List[Tuple[str, str]], entity_type: str = 'person',
+                            alias_type: str = 'email') -> Dict[str, str]:
+        """
+        Create one entity plus alias per (name, identifier) pair in a single transaction.
+        Callers should drop identifiers that already resolve (see resolve_identities_bulk).
+        
+        Returns:
+            Mapping of identifier -> new entity ID
+        """
+        created = {value: str(uuid.uuid4()) for _, value in identities}
+        if not created:
+            return created
+        
+        meta_json = json.dumps({})
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO entities (id, type, canonical_name, metadata) VALUES (?, ?, ?, ?)",
+                [(created[value], entity_type, name, meta_json) for name, value in identities]
+            )
+            conn.executemany(
+                "INSERT INTO aliases (entity_id, alias_type, value) VALUES (?, ?, ?)",
+                [(created[value], alias_type, value) for _, value in identities]
+            )
+            conn.commit()
+        return created
+
     def link_to_org(self, person_id: str, org_id: str):
         """Link a person to an organization."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute(
                 "INSERT INTO relationships (subject_id, object_id, rel_type) VALUES (?, ?, ?)",
                 (person_id, org_id, 'works_at')
@@ -128,7 +211,7 @@ class KnowledgeBase:
 
     def get_all_entities(self, entity_type: str = None) -> List[Dict]:
         """List all entities, optionally filtered by type."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             query = "SELECT * FROM entities"
             params = ()
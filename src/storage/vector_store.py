@@ -5,6 +5,7 @@ Path: src/storage/vector_store.py
 import sqlite3
 import json
 from typing import Dict, List, Optional, Any, Union
+import numpy as np
 from src.storage.knowledge_base import KnowledgeBase
 import chromadb
 from chromadb.config import Settings
@@ -48,6 +49,7 @@ class VectorStore:
         
         Args:
             messages: List of message dictionaries with 'embedding' field
+                (numpy row or list of floats)
             
         Returns:
             bool: True if successful
@@ -155,15 +157,16 @@ class VectorStore:
                 metadatas.append(metadata)
             
             # Add to collection
+            # Stack into one float32 matrix in C instead of handing Chroma
+            # a list of per-row Python lists
             self.collection.add(
                 ids=ids,
-                embeddings=embeddings,
+                embeddings=np.asarray(embeddings, dtype=np.float32),
                 documents=documents,
                 metadatas=metadatas
             )
             
             print(f"[OK] Successfully added {len(messages)} messages")
-            print(f"   Total documents in collection: {self.collection.count()}")
             return True
             
         except Exception as e:
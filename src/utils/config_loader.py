@@ -0,0 +1,91 @@
+"""
+Shared loader for config.yaml.
+Path: src/utils/config_loader.py
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import yaml
+
+try:
+    # libyaml-backed parser, much faster than the pure-Python one
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "config.yaml"
+
+
+def _cache_path(config_path: Path) -> Path:
+    """JSON sidecar next to the YAML file (config.yaml -> config.yaml.jsoncache)"""
+    return config_path.with_name(config_path.name + ".jsoncache")
+
+
+def _read_cache(cache_path: Path, stamp: list) -> Optional[Dict[str, Any]]:
+    """Return the cached config if it was built from the current YAML file"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('source') != stamp:
+        return None
+    return cached.get('config')
+
+
+def _write_cache(cache_path: Path, stamp: list, config: Dict[str, Any]):
+    """Atomically write the sidecar; skipped for configs JSON cannot represent"""
+    try:
+        payload = json.dumps({'source': stamp, 'config': config})
+    except (TypeError, ValueError):
+        return
+    if json.loads(payload)['config'] != config:
+        # e.g. YAML dates or non-string keys would come back different
+        return
+    
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Read-only checkout etc.: caching is best effort
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def load_config(config_path: Optional[Union[str, Path]] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Load configuration from config.yaml.
+    
+    The parsed result is cached in a JSON sidecar and reused until the YAML
+    file's modification time or size changes, so most runs skip YAML
+    parsing entirely.
+    
+    Args:
+        config_path: Config file to read (default: config.yaml at the repo root)
+        use_cache: Read/write the JSON sidecar
+        
+    Returns:
+        Parsed configuration dictionary
+    """
+    path = Path(config_path) if config_path else CONFIG_PATH
+    
+    if use_cache:
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        cache_path = _cache_path(path)
+        cached = _read_cache(cache_path, stamp)
+        if cached is not None:
+            return cached
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=_Loader)
+    
+    if use_cache and isinstance(config, dict):
+        _write_cache(cache_path, stamp, config)
+    return config
@@ -0,0 +1,107 @@
+"""
+Readers (and the message serializer) for raw platform dumps written by
+BaseConnector.save_raw_data.
+Path: src/utils/raw_data.py
+"""
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Union
+
+try:
+    import ijson
+except ImportError:  # Optional: fall back to loading the whole file
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib decoder
+    orjson = None
+
+
+def dump_json_bytes(obj: Any) -> bytes:
+    """
+    Serialize one object to compact UTF-8 JSON.
+    
+    Uses orjson when installed (several times faster than the stdlib
+    encoder on message dicts), json.dumps otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def list_raw_files(raw_dir: Union[str, Path], prefix: str = "gmail_",
+                   suffix: str = ".json") -> List[Path]:
+    """
+    List raw dump files, oldest modification time first.
+    
+    Uses os.scandir so names and stat info come from a single directory
+    read instead of a glob plus one stat() call per file.
+    
+    Args:
+        raw_dir: Folder holding the raw dumps
+        prefix: Required filename prefix
+        suffix: Required filename suffix
+        
+    Returns:
+        Paths sorted by mtime (empty if the folder does not exist)
+    """
+    try:
+        with os.scandir(raw_dir) as it:
+            entries = [
+                (entry.stat().st_mtime, entry.path) for entry in it
+                if entry.name.startswith(prefix) and entry.name.endswith(suffix) and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+    
+    entries.sort()
+    return [Path(path) for _, path in entries]
+
+
+def load_raw_dump(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Load a whole raw dump into memory.
+    
+    With orjson installed the file is memory-mapped and decoded straight
+    from the mapping, skipping the text-mode read and its copy.
+    
+    Args:
+        file_path: Path to a gmail_*.json dump
+        
+    Returns:
+        The dump dictionary ('platform', 'message_count', 'messages', ...)
+    """
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file; let the decoder report it
+                return orjson.loads(b'')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return orjson.loads(memoryview(mm))
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_raw_messages(file_path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the messages of a raw dump one at a time.
+    
+    With ijson installed the 'messages' array is parsed incrementally, so
+    peak memory stays around one message instead of the whole file.
+    
+    Args:
+        file_path: Path to a gmail_*.json dump
+        
+    Yields:
+        Message dictionaries in universal format
+    """
+    if ijson is not None:
+        with open(file_path, 'rb') as f:
+            yield from ijson.items(f, 'messages.item', use_float=True)
+        return
+    
+    yield from load_raw_dump(file_path).get('messages', [])
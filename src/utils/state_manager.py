@@ -81,3 +81,11 @@ class StateManager:
         """Check if an item is in a list state."""
         items = self.get_state(module, platform, default=[])
         return item in items if isinstance(items, list) else False
+
+    def get_set(self, module: str, platform: str) -> frozenset:
+        """
+        Snapshot a list state as a frozenset for repeated O(1) membership checks.
+        Prefer this over calling is_in_list in a loop.
+        """
+        items = self.get_state(module, platform, default=[])
+        return frozenset(items) if isinstance(items, list) else frozenset()
@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.config_loader import CONFIG_PATH, load_config
+
+
+def test_load_config_matches_safe_load():
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        expected = yaml.safe_load(f)
+    
+    assert load_config() == expected
+
+
+def test_load_config_custom_path(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("storage:\n  collection_name: \"test\"\n", encoding='utf-8')
+    
+    assert load_config(config_file) == {"storage": {"collection_name": "test"}}
+
+
+def test_load_config_writes_and_reuses_sidecar(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("paths:\n  raw_data: \"./data/raw\"\n", encoding='utf-8')
+    
+    assert load_config(config_file) == {"paths": {"raw_data": "./data/raw"}}
+    sidecar = tmp_path / "config.yaml.jsoncache"
+    assert sidecar.exists()
+    
+    # A second load is served from the sidecar
+    cached = json.loads(sidecar.read_text(encoding='utf-8'))
+    cached['config']['paths']['raw_data'] = "from-cache"
+    sidecar.write_text(json.dumps(cached), encoding='utf-8')
+    assert load_config(config_file)['paths']['raw_data'] == "from-cache"
+
+
+def test_load_config_sidecar_invalidated_by_edit(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("chunking:\n  chunk_size: 2000\n", encoding='utf-8')
+    load_config(config_file)
+    
+    config_file.write_text("chunking:\n  chunk_size: 1000\n", encoding='utf-8')
+    os.utime(config_file, ns=(0, 10**9))  # Force a distinct mtime
+    assert load_config(config_file) == {"chunking": {"chunk_size": 1000}}
+
+
+def test_load_config_skips_sidecar_for_non_json_values(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("started: 2024-01-01\n", encoding='utf-8')
+    
+    config = load_config(config_file)
+    assert str(config['started']) == "2024-01-01"
+    assert not (tmp_path / "config.yaml.jsoncache").exists()
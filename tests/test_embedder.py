@@ -0,0 +1,83 @@
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("sentence_transformers")
+
+from src.embeddings.embedder import Embedder, normalize_query
+
+
+@pytest.fixture
+def embedder():
+    # The similarity helpers need no model, so skip loading one
+    return Embedder.__new__(Embedder)
+
+
+def test_similarity_batch_matches_similarity(embedder):
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(8).astype(np.float32)
+    embeddings = rng.standard_normal((5, 8)).astype(np.float32)
+    embeddings[2] = 0.0
+    
+    scores = embedder.similarity_batch(query, embeddings)
+    
+    expected = [embedder.similarity(query, row) for row in embeddings]
+    assert scores.shape == (5,)
+    assert np.allclose(scores, expected, atol=1e-6)
+    assert scores[2] == 0.0
+
+
+def test_similarity_batch_zero_query(embedder):
+    scores = embedder.similarity_batch(np.zeros(4), np.ones((3, 4)))
+    assert np.array_equal(scores, np.zeros(3))
+
+
+def _query_embedder(normalize_queries):
+    embedder = Embedder.__new__(Embedder)
+    embedder.query_cache_size = 8
+    embedder.normalize_queries = normalize_queries
+    embedder._query_cache = OrderedDict()
+    embedder._zero = np.zeros(4, dtype=np.float32)
+    embedder.encoded = []
+    
+    def encode(text, **kwargs):
+        embedder.encoded.append(text)
+        return np.full(4, len(embedder.encoded), dtype=np.float32)
+    
+    embedder._encode = encode
+    return embedder
+
+
+def test_normalized_queries_share_a_cache_entry():
+    embedder = _query_embedder(normalize_queries=True)
+    first = embedder.embed_text("What did Alice say about the budget?")
+    again = embedder.embed_text("  what did  alice SAY about the budget?")
+    
+    assert np.array_equal(first, again)
+    assert len(embedder.encoded) == 1
+
+
+def test_queries_differing_in_one_word_miss():
+    embedder = _query_embedder(normalize_queries=True)
+    question = ("Summarize what the finance team said about the Q4 budget "
+                "forecast in the December {} planning emails")
+    embedder.embed_text(question.format(2023))
+    embedder.embed_text(question.format(2024))
+    
+    assert len(embedder.encoded) == 2
+
+
+def test_query_cache_is_exact_without_normalization():
+    embedder = _query_embedder(normalize_queries=False)
+    embedder.embed_text("Budget")
+    embedder.embed_text("budget")
+    
+    assert len(embedder.encoded) == 2
+    assert normalize_query("  Budget\n plan ") == "budget plan"
+
@@ -53,3 +53,16 @@ def test_state_manager_logic(clean_incremental_env):
     new_mgr = StateManager(state_file=TEST_STATE_FILE)
     assert new_mgr.is_in_list("embedding", "gmail", "file1.json")
     assert new_mgr.get_state("ingestion", "gmail")["last_id"] == "123"
+
+def test_state_manager_get_set(clean_incremental_env):
+    state_mgr = StateManager(state_file=TEST_STATE_FILE, auto_save=False)
+    
+    assert state_mgr.get_set("embedding", "gmail") == frozenset()
+    
+    state_mgr.add_to_list("embedding", "gmail", "file1.json")
+    state_mgr.add_to_list("embedding", "gmail", "file2.json")
+    assert state_mgr.get_set("embedding", "gmail") == {"file1.json", "file2.json"}
+    
+    # Non-list state is treated as empty
+    state_mgr.update_state("ingestion", "gmail", {"last_id": "123"})
+    assert state_mgr.get_set("ingestion", "gmail") == frozenset()
@@ -0,0 +1,65 @@
+"""
+Unit tests for KnowledgeBase bulk operations.
+"""
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage.knowledge_base import KnowledgeBase
+
+import pytest
+
+
+@pytest.fixture
+def kb(tmp_path):
+    return KnowledgeBase(db_path=str(tmp_path / "knowledge_base.db"))
+
+
+def test_resolve_identities_bulk(kb):
+    alice = kb.add_entity("Alice Smith")
+    kb.add_alias(alice, "alice@work.com", "email")
+    
+    resolved = kb.resolve_identities_bulk(["alice@work.com", "bob@work.com", "alice@work.com"])
+    assert resolved == {"alice@work.com": alice}
+
+
+def test_resolve_identities_bulk_chunks(kb):
+    created = kb.add_identities_bulk([(f"User {i}", f"user{i}@example.com") for i in range(25)])
+    
+    resolved = kb.resolve_identities_bulk([f"user{i}@example.com" for i in range(30)], chunk_size=7)
+    assert resolved == created
+
+
+def test_add_identities_bulk(kb):
+    created = kb.add_identities_bulk([("Bob", "bob@work.com"), ("Carol", "carol@work.com")])
+    assert set(created) == {"bob@work.com", "carol@work.com"}
+    
+    bob = kb.resolve_identity("bob@work.com")
+    assert bob['id'] == created["bob@work.com"]
+    assert bob['canonical_name'] == "Bob"
+    assert bob['type'] == "person"
+    assert bob['metadata'] == {}
+    
+    assert kb.add_identities_bulk([]) == {}
+
+
+def test_knowledge_base_uses_wal(kb):
+    with kb._connect() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_add_entities_bulk(kb):
+    ids = kb.add_entities_bulk([
+        ("ABC Corp", "organization", None),
+        ("Dana", "person", {"role": "PM"}),
+    ])
+    assert len(ids) == 2
+    
+    people = kb.get_all_entities("person")
+    assert [(e['id'], e['canonical_name']) for e in people] == [(ids[1], "Dana")]
+    assert [e['id'] for e in kb.get_all_entities("organization")] == [ids[0]]
+    
+    assert kb.add_entities_bulk([]) == []
@@ -11,7 +11,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.ingest.mcp_gmail_connector import MCPGmailConnector
-import yaml
+from src.utils.config_loader import load_config
 
 
 import pytest
@@ -19,9 +19,7 @@ import pytest
 @pytest.fixture(scope="module")
 def config():
     """Load configuration"""
-    config_path = Path(__file__).parent.parent / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    return load_config()
 
 @pytest.fixture(scope="module")
 def connector(config):
@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ingest.base_connector import BaseConnector
+from src.utils import raw_data
+from src.utils.raw_data import iter_raw_messages, list_raw_files, load_raw_dump
+
+
+def _write_dump(path, messages):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"platform": "gmail", "message_count": len(messages), "messages": messages}, f)
+
+
+def test_iter_raw_messages_yields_in_order(tmp_path):
+    messages = [
+        {"id": "gmail_1", "subject": "Hello", "content": "First", "attachments": []},
+        {"id": "gmail_2", "subject": "Ünïcode ✓", "content": "Second", "attachments": []},
+    ]
+    dump = tmp_path / "gmail_20240101_000000.json"
+    _write_dump(dump, messages)
+    
+    assert list(iter_raw_messages(dump)) == messages
+
+
+def test_iter_raw_messages_empty_dump(tmp_path):
+    dump = tmp_path / "gmail_empty.json"
+    _write_dump(dump, [])
+    
+    assert list(iter_raw_messages(dump)) == []
+
+
+def test_load_raw_dump_round_trip(tmp_path):
+    messages = [{"id": "gmail_1", "subject": "Ünïcode ✓", "content": "Body", "attachments": []}]
+    dump = tmp_path / "gmail_20240101_000000.json"
+    _write_dump(dump, messages)
+    
+    data = load_raw_dump(dump)
+    assert data["platform"] == "gmail"
+    assert data["messages"] == messages
+
+
+def test_list_raw_files_filters_and_sorts_by_mtime(tmp_path):
+    for name, mtime in [("gmail_b.json", 300), ("gmail_a.json", 100), ("gmail_c.json", 200)]:
+        _write_dump(tmp_path / name, [])
+        os.utime(tmp_path / name, (mtime, mtime))
+    (tmp_path / "notes.json").write_text("{}")
+    (tmp_path / "gmail_partial.tmp").write_text("")
+    
+    assert [p.name for p in list_raw_files(tmp_path)] == ["gmail_a.json", "gmail_c.json", "gmail_b.json"]
+
+
+def test_list_raw_files_missing_dir(tmp_path):
+    assert list_raw_files(tmp_path / "missing") == []
+
+
+def _save(messages, path):
+    # save_raw_data only needs platform_name from the connector
+    BaseConnector.save_raw_data(SimpleNamespace(platform_name="gmail"), messages, str(path))
+
+
+def test_save_raw_data_round_trip(tmp_path):
+    messages = [
+        {"id": "gmail_1", "subject": "Ünïcode ✓", "content": "Line 1\nLine 2", "attachments": []},
+        {"id": "gmail_2", "subject": "Second", "content": "", "attachments": [{"filename": "a.pdf"}]},
+    ]
+    dump = tmp_path / "raw" / "gmail_20240101_000000.json"
+    _save(messages, dump)
+    
+    data = json.loads(dump.read_text(encoding='utf-8'))
+    assert data["platform"] == "gmail"
+    assert data["message_count"] == 2
+    assert data["messages"] == messages
+    assert list(iter_raw_messages(dump)) == messages
+
+
+def test_save_raw_data_empty(tmp_path):
+    dump = tmp_path / "gmail_empty.json"
+    _save([], dump)
+    
+    assert json.loads(dump.read_text(encoding='utf-8'))["messages"] == []
+
+
+def test_save_raw_data_without_orjson(tmp_path, monkeypatch):
+    monkeypatch.setattr(raw_data, "orjson", None)
+    messages = [{"id": "gmail_1", "subject": "Ünïcode ✓", "content": "x"}]
+    dump = tmp_path / "gmail_stdlib.json"
+    _save(messages, dump)
+    
+    assert json.loads(dump.read_text(encoding='utf-8'))["messages"] == messages
@@ -6,7 +6,6 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
-import yaml
 from pathlib import Path
 
 # Add project root to path so we can import from src
@@ -18,12 +17,8 @@ from src.embeddings.embedder import Embedder
 from src.retrieval.search import SearchEngine
 from src.retrieval.brain import RAGBrain
 from src.storage.knowledge_base import KnowledgeBase
+from src.utils.config_loader import load_config
 
-def load_config():
-    """Load configuration from config.yaml"""
-    config_path = root_path / "config.yaml"
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
 
 app = FastAPI(title="Did-I Personal Memory Assistant")
 
@@ -67,7 +62,12 @@ def get_vector_store():
 def get_embedder():
     global _embedder
     if _embedder is None:
-        _embedder = Embedder(model_name=embeddings_config['model_name'])
+        _embedder = Embedder(model_name=embeddings_config['model_name'],
+                             device=embeddings_config.get('device'),
+                             precision=embeddings_config.get('precision', 'auto'),
+                             backend=embeddings_config.get('backend', 'torch'),
+                             num_threads=embeddings_config.get('num_threads'),
+                             normalize_queries=embeddings_config.get('normalized_query_cache', False))
     return _embedder
 
 def get_search_engine():